@@ -20,6 +20,15 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 from okr_api.models2 import metadata
 target_metadata = [metadata]
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Hide the full-text search columns and indexes, created by DDL events, from autogenerate."""
+    if type_ == "column" and name == "search_vector":
+        return False
+    if type_ == "index" and name.endswith("_search_vector"):
+        return False
+    return True
 # target_metadata = None
 
 # other values from the config, defined by the needs of env.py,
@@ -47,6 +56,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -68,7 +78,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
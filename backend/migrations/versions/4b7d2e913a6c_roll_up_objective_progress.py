@@ -0,0 +1,50 @@
+"""roll up objective progress from key results
+
+Revision ID: 4b7d2e913a6c
+Revises: 9c1e5b7a2f40
+Create Date: 2026-10-18 10:47:05.118260
+
+"""
+import typing as t
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7d2e913a6c'
+down_revision: t.Union[str, t.Sequence[str], None] = '9c1e5b7a2f40'
+branch_labels: t.Union[str, t.Sequence[str], None] = None
+depends_on: t.Union[str, t.Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('key_results', sa.Column('weight', sa.Integer(), server_default='1', nullable=False))
+    op.create_check_constraint('ck_key_results_weight', 'key_results', 'weight >= 0')
+    op.add_column('objectives', sa.Column('progress_sum', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('objectives', sa.Column('weight_sum', sa.BigInteger(), server_default='0', nullable=False))
+
+    # Backfill running sums, and progress, of Objectives that have Key Results
+    op.execute("""
+        UPDATE objectives SET
+            progress_sum = rollup.progress_sum,
+            weight_sum = rollup.weight_sum,
+            progress = CASE WHEN rollup.weight_sum > 0
+                THEN (2 * rollup.progress_sum + rollup.weight_sum) / (2 * rollup.weight_sum)
+                ELSE 0 END
+        FROM (
+            SELECT objective_id, SUM(weight * COALESCE(progress, 0)) AS progress_sum, SUM(weight) AS weight_sum
+            FROM key_results
+            GROUP BY objective_id
+        ) AS rollup
+        WHERE objectives.id = rollup.objective_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('objectives', 'weight_sum')
+    op.drop_column('objectives', 'progress_sum')
+    op.drop_constraint('ck_key_results_weight', 'key_results', type_='check')
+    op.drop_column('key_results', 'weight')
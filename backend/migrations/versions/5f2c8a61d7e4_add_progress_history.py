@@ -0,0 +1,46 @@
+"""add progress history of key results
+
+Revision ID: 5f2c8a61d7e4
+Revises: e83a0c5d1b92
+Create Date: 2026-10-18 14:22:09.517730
+
+"""
+import typing as t
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2c8a61d7e4'
+down_revision: t.Union[str, t.Sequence[str], None] = 'e83a0c5d1b92'
+branch_labels: t.Union[str, t.Sequence[str], None] = None
+depends_on: t.Union[str, t.Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'progress_history',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('key_result_id', sa.Integer(), nullable=False),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('recorded_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['key_result_id'], ['key_results.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_progress_history_key_result_id_recorded_at', 'progress_history', ['key_result_id', 'recorded_at'], unique=False)
+    op.create_index('ix_progress_history_recorded_at', 'progress_history', ['recorded_at'], unique=False, postgresql_using='brin')
+
+    # Start the history of existing Key Results from their current progress
+    op.execute("""
+        INSERT INTO progress_history (key_result_id, progress)
+        SELECT id, COALESCE(progress, 0) FROM key_results
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_progress_history_recorded_at', table_name='progress_history', postgresql_using='brin')
+    op.drop_index('ix_progress_history_key_result_id_recorded_at', table_name='progress_history')
+    op.drop_table('progress_history')
@@ -0,0 +1,43 @@
+"""index key_results.objective_id
+
+Revision ID: 9c1e5b7a2f40
+Revises: 
+Create Date: 2026-10-18 10:12:31.402817
+
+"""
+import typing as t
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e5b7a2f40'
+down_revision: t.Union[str, t.Sequence[str], None] = None
+branch_labels: t.Union[str, t.Sequence[str], None] = None
+depends_on: t.Union[str, t.Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # build the index without locking key_results against writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_key_results_objective_id'),
+            'key_results',
+            ['objective_id'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_key_results_objective_id'),
+            table_name='key_results',
+            if_exists=True,
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,50 @@
+"""add full-text search vectors of objectives and key results
+
+Revision ID: a71d3f0c9e58
+Revises: 5f2c8a61d7e4
+Create Date: 2026-10-18 16:03:52.884105
+
+"""
+import typing as t
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a71d3f0c9e58'
+down_revision: t.Union[str, t.Sequence[str], None] = '5f2c8a61d7e4'
+branch_labels: t.Union[str, t.Sequence[str], None] = None
+depends_on: t.Union[str, t.Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # mapped, but missing from databases created by db/schema.sql before it declared it
+    op.execute("ALTER TABLE key_results ADD COLUMN IF NOT EXISTS short_description VARCHAR(255)")
+
+    # generated tsvector columns, with GIN indexes (see okr_api.models2.search_ddl)
+    op.execute("""
+        ALTER TABLE objectives ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_objectives_search_vector ON objectives USING GIN (search_vector)")
+    op.execute("""
+        ALTER TABLE key_results ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(short_description, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_key_results_search_vector ON key_results USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_key_results_search_vector', table_name='key_results')
+    op.drop_column('key_results', 'search_vector')
+    op.drop_index('ix_objectives_search_vector', table_name='objectives')
+    op.drop_column('objectives', 'search_vector')
@@ -0,0 +1,33 @@
+"""add table versions, bumped by writes, for ETags
+
+Revision ID: e83a0c5d1b92
+Revises: 4b7d2e913a6c
+Create Date: 2026-10-18 12:05:41.603318
+
+"""
+import typing as t
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e83a0c5d1b92'
+down_revision: t.Union[str, t.Sequence[str], None] = '4b7d2e913a6c'
+branch_labels: t.Union[str, t.Sequence[str], None] = None
+depends_on: t.Union[str, t.Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(length=63), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
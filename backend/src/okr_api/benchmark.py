@@ -0,0 +1,404 @@
+"""Benchmarks of the API endpoints, driving the app in-process against a seeded database
+
+Run with:
+
+    python -m okr_api.benchmark --sizes 100,1000 --concurrency 1,8 --output results.json
+
+For every data size (number of objectives, with KEY_RESULTS_PER_OBJECTIVE
+key results each on average), the database is emptied and seeded by
+okr_api.seed; then every scenario (a CRUD or list endpoint) is run at every
+concurrency level, through an httpx AsyncClient on the ASGI app of
+create_app(), so no server nor network is involved. Throughput and
+p50/p95/p99 latencies are printed and saved as JSON; pass --compare with
+the JSON of an earlier run, to flag regressions.
+
+The database is a throw-away SQLite file, unless --database-url (or
+OKR_API_BENCH_DATABASE_URL) points at another one, ie a local Postgres.
+Its tables are dropped and recreated: never point it at a database to keep.
+The app runs as in production (SERVER_PRODUCTION), with its cache enabled
+unless --no-cache is passed.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import typing as t
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+
+
+KEY_RESULTS_PER_OBJECTIVE = 4
+
+PAGE_SIZE = 100
+"""Page size of the list scenarios"""
+
+
+@dataclass
+class State:
+    """Data of the seeded database that scenarios pick from, and share.
+
+    Args:
+        objective_ids (List[int]): IDs of the objectives.
+        key_result_ids (List[int]): IDs of the key results (seeded ones; never deleted).
+        created_key_result_ids (List[int]): IDs of the key results created by a scenario
+            (or setup), for the delete scenario to delete.
+        rng (random.Random): Random number generator, seeded for repeatable runs.
+    """
+    objective_ids: t.List[int]
+    key_result_ids: t.List[int]
+    created_key_result_ids: t.List[int] = field(default_factory=list)
+    rng: random.Random = field(default_factory=lambda: random.Random(42))
+
+
+Scenario = t.Callable[[t.Any, State], t.Awaitable[t.Any]]
+
+
+async def list_objectives(client: t.Any, state: State) -> t.Any:
+    return await client.get("/objectives/", params={"limit": PAGE_SIZE})
+
+
+async def list_objectives_with_key_results(client: t.Any, state: State) -> t.Any:
+    return await client.get(
+        "/objectives/", params={"limit": PAGE_SIZE, "include": "key_results"}
+    )
+
+
+async def read_objective(client: t.Any, state: State) -> t.Any:
+    return await client.get(f"/objectives/{state.rng.choice(state.objective_ids)}")
+
+
+async def list_key_results(client: t.Any, state: State) -> t.Any:
+    return await client.get("/key_results/", params={"limit": PAGE_SIZE})
+
+
+async def read_key_result(client: t.Any, state: State) -> t.Any:
+    return await client.get(f"/key_results/{state.rng.choice(state.key_result_ids)}")
+
+
+async def create_objective(client: t.Any, state: State) -> t.Any:
+    return await client.post(
+        "/objectives", json={"name": "Benchmark", "description": "Created by a benchmark"}
+    )
+
+
+async def create_key_result(client: t.Any, state: State) -> t.Any:
+    response = await client.post(
+        "/key_results",
+        json={
+            "objective_id": state.rng.choice(state.objective_ids),
+            "description": "Created by a benchmark",
+            "progress": state.rng.randint(0, 100),
+        },
+    )
+    if response.status_code == 200:
+        state.created_key_result_ids.append(response.json()["id"])
+    return response
+
+
+async def update_key_result(client: t.Any, state: State) -> t.Any:
+    return await client.put(
+        f"/key_results/{state.rng.choice(state.key_result_ids)}",
+        json={"progress": state.rng.randint(0, 100)},
+    )
+
+
+async def delete_key_result(client: t.Any, state: State) -> t.Any:
+    return await client.delete(f"/key_results/{state.created_key_result_ids.pop()}")
+
+
+SCENARIOS: t.Dict[str, Scenario] = {
+    "GET /objectives/": list_objectives,
+    "GET /objectives/?include=key_results": list_objectives_with_key_results,
+    "GET /objectives/{id}": read_objective,
+    "GET /key_results/": list_key_results,
+    "GET /key_results/{id}": read_key_result,
+    "POST /objectives": create_objective,
+    "POST /key_results": create_key_result,
+    "PUT /key_results/{id}": update_key_result,
+    # deletes the key results the previous scenario created, and those its setup creates
+    "DELETE /key_results/{id}": delete_key_result,
+}
+"""Scenarios, in the order they run"""
+
+
+async def create_key_results_to_delete(client: t.Any, state: State, count: int):
+    """Create key results, until there are count for the delete scenario to delete."""
+    while len(state.created_key_result_ids) < count:
+        response = await create_key_result(client, state)
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Failed to create key results to delete: {response.status_code} - "
+                f"{response.text}"
+            )
+
+
+Setup = t.Callable[[t.Any, State, int], t.Awaitable[None]]
+
+SETUPS: t.Dict[str, Setup] = {
+    "DELETE /key_results/{id}": create_key_results_to_delete,
+}
+"""Untimed preparation of scenarios, given the number of requests about to be made"""
+
+
+@dataclass(frozen=True)
+class Result:
+    """Measures of a scenario, at a data size and concurrency level.
+
+    Args:
+        scenario (str): Name of the scenario, ie 'GET /objectives/{id}'.
+        size (int): Number of objectives in the database.
+        concurrency (int): Number of requests in flight at once.
+        requests (int): Number of requests made.
+        errors (int): Number of responses with an error status (4xx or 5xx).
+        throughput (float): Requests per second.
+        p50_ms (float): Median latency, in milliseconds.
+        p95_ms (float): 95th percentile latency, in milliseconds.
+        p99_ms (float): 99th percentile latency, in milliseconds.
+    """
+    scenario: str
+    size: int
+    concurrency: int
+    requests: int
+    errors: int
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+    @property
+    def key(self) -> t.Tuple[str, int, int]:
+        """What the result measures, to match it with the same measure of another run."""
+        return self.scenario, self.size, self.concurrency
+
+
+def percentile(sorted_values: t.Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile of values sorted in increasing order."""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(
+    scenario: str,
+    size: int,
+    concurrency: int,
+    latencies: t.Sequence[float],
+    errors: int,
+    seconds: float,
+) -> Result:
+    """Compute the measures of a scenario run, from the latencies (seconds) of its requests."""
+    latencies = sorted(latencies)
+    return Result(
+        scenario=scenario,
+        size=size,
+        concurrency=concurrency,
+        requests=len(latencies),
+        errors=errors,
+        throughput=round(len(latencies) / seconds, 1),
+        **{
+            f"p{p}_ms": round(percentile(latencies, p) * 1000, 3)
+            for p in (50, 95, 99)
+        },
+    )
+
+
+async def run_scenario(
+    client: t.Any, state: State, scenario: Scenario, requests: int, concurrency: int
+) -> t.Tuple[t.List[float], int, float]:
+    """Make requests, concurrency at a time.
+
+    Returns:
+        Tuple[List[float], int, float]: Latency of each request, number of errors, and
+            the total time taken, in seconds.
+    """
+    latencies: t.List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await scenario(client, state)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code >= 400
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def seed(size: int) -> State:
+    """Replace the data of the database with size objectives, and their key results."""
+    from .db import get_async_engine
+    from .seed import DatasetSpec, load
+
+    spec = DatasetSpec(
+        objectives=size, key_results_per_objective=KEY_RESULTS_PER_OBJECTIVE, seed=size
+    )
+    objective_ids, key_result_ids = await load(get_async_engine(), spec, reset=True)
+    return State(list(objective_ids), list(key_result_ids))
+
+
+async def run_benchmarks(
+    sizes: t.Sequence[int],
+    concurrencies: t.Sequence[int],
+    requests: int,
+    scenarios: t.Optional[t.Sequence[str]] = None,
+    report: t.Callable[[Result], None] = lambda result: None,
+) -> t.List[Result]:
+    """Run scenarios at every data size and concurrency level.
+
+    Args:
+        sizes (Sequence[int]): Numbers of objectives to seed.
+        concurrencies (Sequence[int]): Numbers of requests in flight at once.
+        requests (int): Number of requests per scenario, size and concurrency level.
+        scenarios (Optional[Sequence[str]]): Names of the scenarios to run; default to all.
+        report (Callable[[Result], None]): Called with each result, as soon as measured.
+
+    Returns:
+        List[Result]: The results.
+    """
+    import httpx
+
+    from .cache import cache
+    from .create_app import create_app
+
+    app = create_app()
+    names = [name for name in SCENARIOS if scenarios is None or name in scenarios]
+    results = []
+    async with app.router.lifespan_context(app):
+        # so that a 5xx counts as an error, rather than aborting the run
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for size in sizes:
+                state = await seed(size)
+                for concurrency in concurrencies:
+                    cache.clear()
+                    for name in names:
+                        if name in SETUPS:
+                            await SETUPS[name](client, state, concurrency + requests)
+                        # a few requests first, so that the measure leaves out one-off costs
+                        await run_scenario(client, state, SCENARIOS[name], concurrency, 1)
+                        latencies, errors, seconds = await run_scenario(
+                            client, state, SCENARIOS[name], requests, concurrency
+                        )
+                        result = summarize(name, size, concurrency, latencies, errors, seconds)
+                        results.append(result)
+                        report(result)
+    return results
+
+
+def compare(
+    results: t.Sequence[Result], baseline: t.Sequence[Result], tolerance: float
+) -> t.List[str]:
+    """Describe the results that regressed from the same measure of a baseline run.
+
+    Args:
+        results (Sequence[Result]): Results of the current run.
+        baseline (Sequence[Result]): Results of an earlier run.
+        tolerance (float): Relative change allowed, ie 0.2 for 20%.
+
+    Returns:
+        List[str]: A line per regression, of throughput or p95 latency.
+    """
+    previous = {result.key: result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result.key)
+        if before is None:
+            continue
+        name = f"{result.scenario} (size {result.size}, concurrency {result.concurrency})"
+        if result.throughput < before.throughput * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {before.throughput} -> {result.throughput} req/s"
+            )
+        if result.p95_ms > before.p95_ms * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before.p95_ms} -> {result.p95_ms} ms")
+    return regressions
+
+
+def format_result(result: Result) -> str:
+    """A line of the results table."""
+    return (
+        f"{result.scenario:<38} {result.size:>7} {result.concurrency:>4} "
+        f"{result.throughput:>9.1f} {result.p50_ms:>9.2f} {result.p95_ms:>9.2f} "
+        f"{result.p99_ms:>9.2f} {result.errors:>6}"
+    )
+
+
+def load_results(path: str) -> t.List[Result]:
+    """Results saved by an earlier run."""
+    with open(path) as file:
+        return [Result(**result) for result in json.load(file)["results"]]
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100,1000", help="Numbers of objectives to seed")
+    parser.add_argument("--concurrency", default="1,8", help="Requests in flight at once")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per measure")
+    parser.add_argument("--scenario", action="append", help="Run this scenario only")
+    parser.add_argument("--database-url", default=os.getenv("OKR_API_BENCH_DATABASE_URL"))
+    parser.add_argument("--no-cache", action="store_true", help="Disable the API cache")
+    parser.add_argument("--output", help="Save the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of an earlier run, to flag regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative change")
+    args = parser.parse_args(argv)
+
+    # configure the app before importing it, as it reads its settings at import
+    database_url = args.database_url or "sqlite+aiosqlite:///{}".format(
+        os.path.join(tempfile.mkdtemp(), "okr_api_bench.db")
+    )
+    os.environ["ASYNC_DATABASE_URL"] = database_url
+    os.environ["SERVER_PRODUCTION"] = "true"
+    if args.no_cache:
+        os.environ["CACHE_MAX_SIZE"] = "0"
+
+    from sqlalchemy.engine import make_url
+
+    print(
+        f"{'scenario':<38} {'size':>7} {'conc':>4} {'req/s':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>6}"
+    )
+    results = asyncio.run(
+        run_benchmarks(
+            [int(size) for size in args.sizes.split(",")],
+            [int(concurrency) for concurrency in args.concurrency.split(",")],
+            args.requests,
+            args.scenario,
+            report=lambda result: print(format_result(result), flush=True),
+        )
+    )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(
+                {
+                    "meta": {
+                        "date": datetime.now(timezone.utc).isoformat(),
+                        "database": make_url(database_url).get_backend_name(),
+                        "cache": not args.no_cache,
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                    },
+                    "results": [asdict(result) for result in results],
+                },
+                file,
+                indent=2,
+            )
+    if args.compare:
+        regressions = compare(results, load_results(args.compare), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""In-process read-through cache of objectives and key results
+
+Entries are evicted least recently used first, once the cache is full, and
+expire after a TTL. Every entry carries tags, ie ("objectives", 3) for an
+objective or ("objectives",) for a list of them, and committed changes (see
+okr_api.changes) invalidate the entries tagged with the written entities and
+the lists of their tables.
+
+Entries also record the table versions the ETag of the request that stored
+them was derived from (see okr_api.versions), and are only served to
+requests whose ETag has the same versions: a reader can see a write's new
+versions before the invalidation of that write has run here, and must not
+serve the data from before the write under the ETag from after it.
+
+The cache lives in each worker process. On Postgres, writes served by other
+workers invalidate it too, as their changes are notified to every worker
+(see okr_api.notifications); on SQLite, they are only seen here once the
+entries expire.
+"""
+import contextvars
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+
+from .changes import Change, subscribe
+from .settings import CacheSettings
+
+
+Key = t.Hashable
+Tag = t.Tuple[t.Any, ...]
+Versions = t.Tuple[t.Tuple[str, int], ...]
+"""Versions of tables, ie (("key_results", 4), ("objectives", 7))"""
+
+MISSING = object()
+"""Returned by Cache.get, on a miss"""
+
+request_versions: contextvars.ContextVar[t.Optional[Versions]] = contextvars.ContextVar(
+    "okr_api.request_versions", default=None
+)
+"""Table versions of the current request's ETag, set by the okr_api.versions.ETag dependency"""
+
+
+class Cache:
+    """Bounded LRU cache, with a TTL and invalidation by tag.
+
+    Args:
+        max_size (int): Entries kept, before evicting the least recently used; 0 disables.
+        ttl (float): Seconds an entry is served for.
+        clock (Callable[[], float]): Monotonic time source, in seconds.
+    """
+
+    def __init__(
+        self, max_size: int, ttl: float, clock: t.Callable[[], float] = time.monotonic
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: (
+            "OrderedDict[Key, t.Tuple[float, t.Any, t.Tuple[Tag, ...], t.Optional[Versions]]]"
+        ) = OrderedDict()
+        self._keys_by_tag: t.Dict[Tag, t.Set[Key]] = {}
+        # incremented by every invalidation, to not store values read before it
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_settings(cls, settings: CacheSettings) -> "Cache":
+        """Create a cache sized and timed as configured."""
+        return cls(settings.max_size, settings.ttl)
+
+    def get(self, key: Key, versions: t.Optional[Versions] = None) -> t.Any:
+        """Value stored under a key, or MISSING if absent, expired or of other versions."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock() or entry[3] != versions:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(
+        self,
+        key: Key,
+        value: t.Any,
+        tags: t.Iterable[Tag],
+        generation: int,
+        versions: t.Optional[Versions] = None,
+    ):
+        """Store a value read from the database, unless invalidated since it was read.
+
+        Args:
+            key (Hashable): Key to store the value under.
+            value (Any): Value to store; never mutate it afterwards.
+            tags (Iterable[Tuple]): Tags of the entities and tables the value was read from.
+            generation (int): Cache generation at the time the read started.
+            versions (Optional[Versions]): Table versions read along with the value, if any.
+        """
+        if not self.max_size:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            tags = tuple(tags)
+            self._entries[key] = (self._clock() + self.ttl, value, tags, versions)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags: t.Iterable[Tag]):
+        """Remove every entry carrying any of the tags."""
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                for key in self._keys_by_tag.get(tag, set()).copy():
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def invalidate_changes(self, changes: t.List[Change]):
+        """Remove the entries of the written entities and the lists of their tables."""
+        tags = {(change.table, change.id) for change in changes}
+        self.invalidate(tags | {(change.table,) for change in changes})
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def _remove(self, key: Key):
+        _, _, tags, _ = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag[tag]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_tag[tag]
+
+    def stats(self) -> t.Dict[str, t.Any]:
+        """Current counters, as a JSON-able dictionary."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    async def read_through(
+        self, key: Key, tags: t.Iterable[Tag], load: t.Callable[[], t.Awaitable[t.Any]]
+    ) -> t.Any:
+        """Serve a value from the cache, or load it from the database and store it.
+
+        Values are stored, and served, along with the table versions of the
+        request's ETag, if it has one.
+
+        Args:
+            key (Hashable): Key the value is stored under.
+            tags (Iterable[Tuple]): Tags of the entities and tables the value is read from.
+            load (Callable[[], Awaitable[Any]]): Reads the value from the database.
+
+        Returns:
+            Any: The (cached) value.
+        """
+        versions = request_versions.get()
+        value = self.get(key, versions)
+        if value is MISSING:
+            generation = self.generation
+            value = await load()
+            self.set(key, value, tags, generation, versions)
+        return value
+
+
+cache = Cache.from_settings(CacheSettings.from_env())
+"""Cache of the API process, invalidated by committed changes"""
+
+subscribe(cache.invalidate_changes)
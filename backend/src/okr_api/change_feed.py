@@ -0,0 +1,168 @@
+"""Feed of the committed changes to Objectives and Key Results, for clients to follow
+
+Every change (see okr_api.changes) becomes a numbered event, fanned out to
+the queue of every subscriber (ie a server-sent events stream). Recent events
+are kept, so that a subscriber reconnecting with the ID of the last event
+it saw misses none. A subscriber that missed events, because they are
+no longer kept or because it fell too far behind, is told to reset: to
+re-fetch whatever state it keeps.
+"""
+import asyncio
+import contextlib
+import json
+import threading
+import typing as t
+import uuid
+from collections import deque
+from dataclasses import dataclass
+
+from .changes import Change, subscribe
+
+
+ENTITIES = {
+    "objectives": "objective",
+    "key_results": "key_result",
+}
+"""Entity name of the rows of each table, in events"""
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """A change, numbered in the order it was committed.
+
+    Args:
+        feed_id (str): ID of the feed instance (process) that numbered the event.
+        number (int): Number of the event, increasing by 1 with every event.
+        change (Change): The change.
+    """
+    feed_id: str
+    number: int
+    change: Change
+
+    @property
+    def id(self) -> str:
+        """ID of the event, unique across restarts of the process."""
+        return f"{self.feed_id}.{self.number}"
+
+    def data(self) -> t.Dict[str, t.Any]:
+        """Compact, JSON-able description of the change: entity, id, op and changed fields."""
+        data = {
+            "entity": ENTITIES.get(self.change.table, self.change.table),
+            "id": self.change.id,
+            "op": self.change.op,
+        }
+        if self.change.fields:
+            data["fields"] = list(self.change.fields)
+        return data
+
+    def to_sse(self) -> str:
+        """The event, in server-sent events format."""
+        return f"id: {self.id}\nevent: change\ndata: {json.dumps(self.data())}\n\n"
+
+
+class Subscription:
+    """Queue of the events of a feed, for a single subscriber (in an event loop).
+
+    Args:
+        loop (asyncio.AbstractEventLoop): Event loop the subscriber runs in.
+        max_size (int): Events queued, before the subscriber is considered too slow.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_size: int):
+        self.loop = loop
+        self._queue: "asyncio.Queue[ChangeEvent]" = asyncio.Queue(max_size)
+        # set when events were missed; the subscriber must re-fetch its state
+        self.reset = False
+        self.overflowed = False
+
+    def put(self, event: ChangeEvent):
+        """Queue an event; call from the subscriber's event loop."""
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = self.reset = True
+
+    async def get(self, timeout: t.Optional[float] = None) -> t.Optional[ChangeEvent]:
+        """Next event, or None if there was none within timeout seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ChangeFeed:
+    """Fans out committed changes, as numbered events, to subscribers.
+
+    Args:
+        queue_size (int): Events queued per subscriber, before it is dropped as too slow.
+        history_size (int): Recent events kept, to replay to reconnecting subscribers.
+    """
+
+    def __init__(self, queue_size: int = 1000, history_size: int = 1000):
+        self.queue_size = queue_size
+        # tells the events of this instance apart from those numbered before a restart
+        self.id = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._last_number = 0
+        self._history: t.Deque[ChangeEvent] = deque(maxlen=history_size)
+        self._subscriptions: t.Set[Subscription] = set()
+
+    def publish(self, changes: t.List[Change]):
+        """Send changes to every subscriber; safe to call from any thread."""
+        with self._lock:
+            for change in changes:
+                self._last_number += 1
+                event = ChangeEvent(self.id, self._last_number, change)
+                self._history.append(event)
+                for subscription in self._subscriptions:
+                    subscription.loop.call_soon_threadsafe(subscription.put, event)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(
+        self, last_event_id: t.Optional[str] = None
+    ) -> t.AsyncIterator[Subscription]:
+        """Receive the events published from now on, while in the context.
+
+        Args:
+            last_event_id (Optional[str]): ID of the last event seen, to also receive the
+                events published after it; if they are no longer kept, reset is set.
+
+        Yields:
+            Subscription: The queue of events.
+        """
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                self._replay(subscription, last_event_id)
+            self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions.discard(subscription)
+
+    def _replay(self, subscription: Subscription, last_event_id: str):
+        """Queue the events published after the last one seen; set reset if they are gone."""
+        feed_id, _, number = last_event_id.partition(".")
+        if feed_id != self.id or not number.isdigit() or int(number) > self._last_number:
+            subscription.reset = True
+            return
+        missed = [event for event in self._history if event.number > int(number)]
+        if missed and missed[0].number != int(number) + 1:
+            subscription.reset = True
+            return
+        for event in missed:
+            subscription.put(event)
+
+    @property
+    def subscribers(self) -> int:
+        """Number of current subscribers."""
+        return len(self._subscriptions)
+
+
+feed = ChangeFeed()
+"""Feed of the changes committed by the API process"""
+
+subscribe(feed.publish)
@@ -0,0 +1,85 @@
+"""Tracking of the writes a transaction makes to Objectives and Key Results
+
+Handlers record each entity they create, update or delete on their session.
+Components that must react to writes either read the changes pending on the
+session, before it commits (ie to bump table versions), or subscribe to the
+changes of every transaction, once it has committed (ie to invalidate caches).
+"""
+import typing as t
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+@dataclass(frozen=True)
+class Change:
+    """A write to a single entity (row).
+
+    Args:
+        table (str): Table of the entity, ie 'objectives' or 'key_results'.
+        id (int): ID of the entity.
+        op (str): Kind of write: 'create', 'update' or 'delete'.
+        fields (Tuple[str, ...]): Names of the fields an update changed.
+    """
+    table: str
+    id: int
+    op: str
+    fields: t.Tuple[str, ...] = ()
+
+
+_PENDING = "okr_api.pending_changes"
+
+
+def record_change(
+    db: t.Any, table: str, ids: t.Iterable[int], op: str, fields: t.Iterable[str] = ()
+):
+    """Record writes to entities of a table, to be reported when the transaction commits.
+
+    Args:
+        db (Union[AsyncSession, Session]): Session of the transaction making the writes.
+        table (str): Table of the entities written.
+        ids (Iterable[int]): IDs of the entities written.
+        op (str): Kind of write: 'create', 'update' or 'delete'.
+        fields (Iterable[str]): Names of the fields changed, on update.
+    """
+    fields = tuple(fields)
+    db.info.setdefault(_PENDING, []).extend(Change(table, id, op, fields) for id in ids)
+
+
+def pending_changes(session: Session) -> t.List[Change]:
+    """Changes recorded on a session, since its last commit or rollback."""
+    return session.info.get(_PENDING, [])
+
+
+_subscribers: t.List[t.Callable[[t.List[Change]], None]] = []
+
+
+def subscribe(callback: t.Callable[[t.List[Change]], None]):
+    """Call a function with the changes of every transaction, right after it commits.
+
+    Callbacks run synchronously, in the committing request, so they must be quick.
+    """
+    _subscribers.append(callback)
+
+
+def publish(changes: t.List[Change]):
+    """Call the subscribed functions with committed changes.
+
+    Called on commit, and with the changes committed by other processes (see
+    okr_api.notifications).
+    """
+    for callback in _subscribers:
+        callback(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session: Session):
+    changes = session.info.pop(_PENDING, None)
+    if changes:
+        publish(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session):
+    session.info.pop(_PENDING, None)
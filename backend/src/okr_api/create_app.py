@@ -1,6 +1,48 @@
+import contextlib
+import logging
 import typing as t
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.engine import make_url
+from .metrics import MetricsMiddleware
+from .pagination import NEXT_CURSOR_HEADER
+from .queries import QueryRepeatMiddleware
+from .settings import ServerSettings
+
+
+logger = logging.getLogger(__name__)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> t.AsyncIterator[None]:
+    """Set up the resources of the app's process for its lifetime, and release them after.
+
+    Creates the database engine and opens its pool's connections, in the
+    process that serves (each worker has its own). On Postgres, also listens
+    to the changes committed by the other processes, so that each one's
+    cache and change feed reflect all writes.
+    """
+    from .cache import cache
+    from .db import ASYNC_DATABASE_URL, dispose_async_engine, warm_up_async_engine
+    from .notifications import ChangeListener
+
+    try:
+        await warm_up_async_engine()
+    except Exception as e:
+        # the pool connects on demand, once the database is reachable
+        logger.warning("Could not warm up the database connection pool: %s", e)
+    listener = None
+    if make_url(ASYNC_DATABASE_URL).get_backend_name() == "postgresql":
+        # notifications missed while reconnecting may have left stale entries
+        listener = ChangeListener(ASYNC_DATABASE_URL, on_reconnect=cache.clear)
+        await listener.start()
+    try:
+        yield
+    finally:
+        if listener:
+            await listener.stop()
+        await dispose_async_engine()
 
 
 def create_app() -> FastAPI:
@@ -11,7 +53,8 @@ def create_app() -> FastAPI:
     Returns:
         FastAPI: The initialized FastAPI application.
     """
-    app = FastAPI()
+    # serialize responses with orjson, from the output of the response models
+    app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
     # Add CORS middleware
     app.add_middleware(
@@ -20,7 +63,16 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
+    # time requests (and their database queries) per route, for /metrics
+    app.add_middleware(MetricsMiddleware)
+    server_settings = ServerSettings.from_env()
+    if not server_settings.production and server_settings.query_repeat_threshold:
+        # warn of N+1 queries, while developing
+        app.add_middleware(
+            QueryRepeatMiddleware, threshold=server_settings.query_repeat_threshold
+        )
 
     # Import and include routers here
     from .endpoints.sample import router as sample_router
@@ -29,5 +81,24 @@ def create_app() -> FastAPI:
     app.include_router(objectives_router)
     from .endpoints.key_results import router as key_results_router
     app.include_router(key_results_router)
+    from .endpoints.progress_history import router as progress_history_router
+    app.include_router(progress_history_router)
+    from .endpoints.dashboard import router as dashboard_router
+    app.include_router(dashboard_router)
+    from .endpoints.search import router as search_router
+    app.include_router(search_router)
+    from .endpoints.events import router as events_router
+    app.include_router(events_router)
+    from .endpoints.export import router as export_router
+    app.include_router(export_router)
+    from .endpoints.imports import router as imports_router
+    app.include_router(imports_router)
+    from .endpoints.diagnostics import router as diagnostics_router
+    app.include_router(diagnostics_router)
+    from .endpoints.metrics import router as metrics_router
+    app.include_router(metrics_router)
+
+    # notify the other processes of the changes committed by this one
+    from . import notifications  # noqa: F401
 
     return app
@@ -1,6 +1,11 @@
+import asyncio
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import typing as t
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from .pool import InstrumentedAsyncAdaptedQueuePool
+from .settings import DatabaseSettings
 
 
 DATABASE_URL = os.getenv(
@@ -9,32 +14,115 @@ DATABASE_URL = os.getenv(
 """Format is dialect[+driver]://user:password@host/dbname[?key=value..]"""
 
 
-try:
-    engine = create_engine(DATABASE_URL, echo=True)
-except Exception as e:
-    print(f"Error creating engine with DATABASE_URL {DATABASE_URL}: {e}")
-    raise RuntimeError(f"Failed to create engine with DATABASE_URL {DATABASE_URL}: {e}")
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+"""Async DBAPI driver to use per database backend (dialect)."""
 
-print(f"\n\n---- Engine created from URL {DATABASE_URL} with driver: {engine}")  # Debug statement
 
-SessionLocal = sessionmaker(
-    bind=engine,
-    autocommit=False,
+def to_async_url(url: str) -> str:
+    """Derive the asyncio-compatible variant of a (sync) database URL.
+
+    Call this to swap the sync driver (ie psycopg2) of a URL for its async
+    counterpart (ie asyncpg), keeping host, credentials and database intact.
+
+    Args:
+        url (str): Database URL, in dialect[+driver]://.. format.
+
+    Returns:
+        str: The same URL, using the async driver of its dialect.
+    """
+    sa_url = make_url(url)
+    backend = sa_url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for database backend '{backend}'")
+    return sa_url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+"""URL used by the async engine, derived from DATABASE_URL unless explicitly set"""
+
+DATABASE_SETTINGS = DatabaseSettings.from_env()
+"""Pool sizing and logging, read from DB_POOL_SIZE, DB_MAX_OVERFLOW, .., DB_ECHO"""
+
+
+AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
+    # keep loaded attributes usable after commit, without an implicit (blocking) refresh
+    expire_on_commit=False,
 )
+"""Async session factory, bound to the async engine once the process creates it"""
+
+_async_engine: t.Optional[AsyncEngine] = None
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection: t.Any, connection_record: t.Any):
+    # off by default on SQLite: without it, neither FKs nor ON DELETE CASCADE are enforced
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def get_async_engine() -> AsyncEngine:
+    """Provide the async engine (and connection pool) of the current process.
+
+    The engine is created on first use rather than at import, so that every
+    server worker process opens connections of its own, after it has started.
+
+    Returns:
+        AsyncEngine: The async engine, also bound to AsyncSessionLocal.
+    """
+    global _async_engine
+    if _async_engine is None:
+        try:
+            _async_engine = create_async_engine(
+                ASYNC_DATABASE_URL,
+                poolclass=InstrumentedAsyncAdaptedQueuePool,
+                **DATABASE_SETTINGS.engine_options(),
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to create async engine: {e}")
+        if _async_engine.dialect.name == "sqlite":
+            event.listen(_async_engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+        AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+
+async def warm_up_async_engine(connections: int = DATABASE_SETTINGS.pool_size):
+    """Open connections of the async pool upfront, so that first requests do not wait on them.
+
+    Args:
+        connections (int): Number of connections to open, at once.
+    """
+    async_engine = get_async_engine()
+
+    async def connect():
+        async with async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(connect() for _ in range(connections)))
+
+
+async def dispose_async_engine():
+    """Close the connections of the async pool, and drop the engine."""
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
 
-# Base = declarative_base()
 
-def get_db_session():
-    """Provide a synchronous database session.
+async def get_async_db_session():
+    """Provide an asynchronous database session.
 
-    Call this to yield a session for database operations.
+    Call this to yield a session for database operations, that does not block
+    the event loop while waiting on the database.
 
     Yields:
-        Session: A synchronous SQLAlchemy session.
+        AsyncSession: An asynchronous SQLAlchemy session.
     """
-    db = SessionLocal()
-    try:
+    get_async_engine()  # binds AsyncSessionLocal, when outside of the app lifespan
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,97 @@
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..cache import cache
+from ..db import get_async_db_session
+from ..models2 import KeyResult, Objective
+from ..versions import ETag
+import typing as t
+
+router = APIRouter()
+
+
+COMPLETED_PROGRESS = 100
+"""Progress at which a key result counts as completed"""
+
+
+class ObjectiveSummary(BaseModel):
+    """Aggregates of an Objective's Key Results, for the dashboard.
+
+    Args:
+        id (int): ID of the objective.
+        name (str): Name of the objective.
+        description (str): Description of the objective.
+        progress (Optional[int]): Progress of the objective, weighted by key result.
+        key_results (int): Number of key results.
+        completed_key_results (int): Number of key results at 100% progress.
+        avg_progress (Optional[float]): Average progress of the key results, if any.
+        min_progress (Optional[int]): Lowest progress of the key results, if any.
+        max_progress (Optional[int]): Highest progress of the key results, if any.
+    """
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    name: str
+    description: str
+    progress: t.Optional[int] = None
+    key_results: int
+    completed_key_results: int
+    avg_progress: t.Optional[float] = None
+    min_progress: t.Optional[int] = None
+    max_progress: t.Optional[int] = None
+
+
+SortKey = t.Literal["id", "progress", "key_results", "completed_key_results"]
+
+
+@router.get(
+    "/dashboard/summary", dependencies=[Depends(ETag("objectives", "key_results"))]
+)
+async def read_dashboard_summary(
+    sort: SortKey = "id",
+    order: t.Literal["asc", "desc"] = "asc",
+    limit: t.Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_async_db_session),
+) -> t.List[ObjectiveSummary]:
+    """Summarize the key results of every objective, or of the top objectives by a sort key.
+
+    All aggregates come from a single GROUP BY query over objectives and key results.
+    """
+    async def load():
+        # no progress, rather than 0, for objectives without key results (outer join)
+        progress = case(
+            (KeyResult.id.is_not(None), func.coalesce(KeyResult.progress, 0))
+        )
+        columns = {
+            "key_results": func.count(KeyResult.id),
+            "completed_key_results": func.count(
+                case((KeyResult.progress >= COMPLETED_PROGRESS, KeyResult.id))
+            ),
+            "avg_progress": func.avg(progress),
+            "min_progress": func.min(progress),
+            "max_progress": func.max(progress),
+        }
+        sort_keys = [{"id": Objective.id, "progress": Objective.progress, **columns}[sort]]
+        if sort != "id":
+            sort_keys.append(Objective.id)  # tie-breaker
+        if order == "desc":
+            sort_keys = [key.desc() for key in sort_keys]
+        query = (
+            select(
+                Objective.id,
+                Objective.name,
+                Objective.description,
+                Objective.progress,
+                *(column.label(name) for name, column in columns.items()),
+            )
+            .outerjoin(KeyResult, KeyResult.objective_id == Objective.id)
+            .group_by(Objective.id)
+            .order_by(*sort_keys)
+            .limit(limit)
+        )
+        return [ObjectiveSummary.model_validate(row) for row in await db.execute(query)]
+
+    return await cache.read_through(
+        ("dashboard_summary", sort, order, limit), [("objectives",), ("key_results",)], load
+    )
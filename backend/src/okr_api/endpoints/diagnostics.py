@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from ..cache import cache
+from ..db import get_async_engine
+from ..pool import pool_status
+import typing as t
+
+router = APIRouter()
+
+
+@router.get("/diagnostics/db_pool")
+async def read_db_pool_status() -> t.Dict[str, t.Any]:
+    """Report connections checked out, idle and in overflow, plus checkout waits."""
+    return pool_status(get_async_engine().pool)
+
+
+@router.get("/diagnostics/cache")
+async def read_cache_stats() -> t.Dict[str, t.Any]:
+    """Report the size of the objectives and key results cache, plus its hits and misses."""
+    return cache.stats()
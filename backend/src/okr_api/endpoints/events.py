@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+from ..change_feed import ChangeFeed, feed
+import typing as t
+
+router = APIRouter()
+
+
+KEEPALIVE_SECONDS = 15.0
+"""Idle time after which a comment is sent, so that proxies keep the stream open"""
+
+RETRY_MILLISECONDS = 3000
+"""Delay clients wait before reconnecting a dropped stream"""
+
+
+async def change_events(
+    change_feed: ChangeFeed, last_event_id: t.Optional[str] = None
+) -> t.AsyncIterator[str]:
+    """Server-sent events of the changes committed, from now on, or after last_event_id.
+
+    A 'reset' event tells the client it missed changes and must re-fetch its
+    state; the stream ends after it, if the client fell too far behind.
+    """
+    async with change_feed.subscribe(last_event_id) as subscription:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            if subscription.reset:
+                subscription.reset = False
+                yield "event: reset\ndata: {}\n\n"
+                if subscription.overflowed:
+                    return
+            event = await subscription.get(timeout=KEEPALIVE_SECONDS)
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield event.to_sse()
+
+
+@router.get("/events")
+async def read_change_events(
+    last_event_id: t.Optional[str] = Header(None),
+) -> StreamingResponse:
+    """Stream the changes to objectives and key results, as they are committed.
+
+    Each server-sent 'change' event carries the entity ('objective' or
+    'key_result'), its id, the op ('create', 'update' or 'delete') and, for
+    updates, the fields changed. Reconnecting with the Last-Event-ID header
+    resumes the stream; a 'reset' event asks the client to re-fetch instead.
+    """
+    return StreamingResponse(
+        change_events(feed, last_event_id),
+        media_type="text/event-stream",
+        # no caching, nor buffering by proxies, of the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,101 @@
+import csv
+import io
+import typing as t
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+
+from ..db import AsyncSessionLocal
+from ..models2 import Base, KeyResult, Objective
+from .key_results import KeyResultRead
+from .objectives import ObjectiveRead
+
+router = APIRouter()
+
+
+EXPORT_BATCH_SIZE = 1000
+"""Rows fetched from the server-side cursor, and written to the response, at a time"""
+
+ExportFormat = t.Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def to_ndjson(rows: t.Sequence[BaseModel]) -> bytes:
+    """Serialize rows as newline-delimited JSON objects."""
+    return "".join(row.model_dump_json() + "\n" for row in rows).encode()
+
+
+def to_csv(rows: t.Sequence[BaseModel]) -> bytes:
+    """Serialize rows as CSV lines, in the order of the model fields."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(row.model_dump().values() for row in rows)
+    return buffer.getvalue().encode()
+
+
+def csv_header(read_model: t.Type[BaseModel]) -> bytes:
+    """CSV header line, naming the model fields."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(read_model.model_fields)
+    return buffer.getvalue().encode()
+
+
+SERIALIZERS = {
+    "ndjson": to_ndjson,
+    "csv": to_csv,
+}
+
+
+async def stream_rows(
+    model: t.Type[Base], read_model: t.Type[BaseModel], format: ExportFormat
+) -> t.AsyncIterator[bytes]:
+    """Stream every row of a table, ordered by ID, through a server-side cursor.
+
+    Only one batch of rows is in memory at a time, whatever the size of the table.
+
+    Args:
+        model (Type[Base]): ORM model of the table to export.
+        read_model (Type[BaseModel]): Response model to serialize each row with.
+        format (str): 'ndjson' or 'csv'.
+
+    Yields:
+        bytes: Serialized rows, a batch at a time.
+    """
+    serialize = SERIALIZERS[format]
+    if format == "csv":
+        yield csv_header(read_model)
+    columns = [model.__table__.c[field] for field in read_model.model_fields]
+    query = select(*columns).order_by(model.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    # a session of its own, since request dependencies exit before the response is streamed
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            yield serialize([read_model.model_validate(row) for row in partition])
+
+
+def export_response(
+    model: t.Type[Base], read_model: t.Type[BaseModel], format: ExportFormat
+) -> StreamingResponse:
+    """Stream an export of a table as a downloadable file."""
+    filename = f"{model.__tablename__}.{format}"
+    return StreamingResponse(
+        stream_rows(model, read_model, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/export/objectives")
+async def export_objectives(format: ExportFormat = "ndjson") -> StreamingResponse:
+    """Export all objectives, ordered by ID, as NDJSON (one object per line) or CSV."""
+    return export_response(Objective, ObjectiveRead, format)
+
+@router.get("/export/key_results")
+async def export_key_results(format: ExportFormat = "ndjson") -> StreamingResponse:
+    """Export all key results, ordered by ID, as NDJSON (one object per line) or CSV."""
+    return export_response(KeyResult, KeyResultRead, format)
@@ -0,0 +1,216 @@
+import codecs
+import csv
+import typing as t
+
+import orjson
+from fastapi import APIRouter, Depends, Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..changes import record_change
+from ..db import get_async_db_session
+from ..models2 import KeyResult, Objective
+from ..progress import ProgressRollup
+from .export import ExportFormat as ImportFormat
+from .key_results import KeyResultCreate
+from .objectives import ObjectiveCreate
+
+router = APIRouter()
+
+
+IMPORT_BATCH_SIZE = 1000
+"""Rows validated, and inserted with a single executemany, at a time"""
+
+
+class RowError(BaseModel):
+    """Why a row of an import was rejected.
+
+    Args:
+        row (int): Number of the row, starting at 1 (not counting a CSV header).
+        errors (List[str]): Problems found, ie "progress: Input should be a valid number".
+    """
+    row: int
+    errors: t.List[str]
+
+class ImportReport(BaseModel):
+    """Outcome of an import.
+
+    Args:
+        imported (int): Number of rows imported.
+        errors (List[RowError]): Rows rejected, which were not imported.
+    """
+    imported: int = 0
+    errors: t.List[RowError] = []
+
+
+Row = t.Tuple[int, t.Any]
+
+
+async def read_lines(chunks: t.AsyncIterator[bytes]) -> t.AsyncIterator[str]:
+    """Lines (with their line break) of a UTF-8 document, as its chunks arrive."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def parse_rows(
+    lines: t.AsyncIterator[str], format: ImportFormat
+) -> t.AsyncIterator[Row]:
+    """Numbered rows of an NDJSON or CSV document; None for a row that is not valid JSON.
+
+    Empty CSV fields are left out, so that they take their default values.
+    """
+    number = 0
+    if format == "csv":
+        fieldnames: t.Optional[t.List[str]] = None
+        record = ""
+        async for line in lines:
+            record += line
+            if record.count('"') % 2:
+                continue  # inside a quoted field, which spans lines
+            if fieldnames is None:
+                fieldnames = next(csv.reader([record]), None)
+            else:
+                for row in csv.DictReader([record], fieldnames=fieldnames):
+                    number += 1
+                    yield number, {
+                        key: value for key, value in row.items() if key and value != ""
+                    }
+            record = ""
+        return
+    async for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            yield number, orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield number, None
+
+
+async def batches(rows: t.AsyncIterator[Row], size: int) -> t.AsyncIterator[t.List[Row]]:
+    """Split rows into lists of at most size rows."""
+    batch: t.List[Row] = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+M = t.TypeVar("M", bound=BaseModel)
+
+
+def validate_rows(
+    rows: t.List[Row], model: t.Type[M], report: ImportReport
+) -> t.List[t.Tuple[int, M]]:
+    """Validate rows against a request model, reporting the rows that fail."""
+    valid = []
+    for number, data in rows:
+        if not isinstance(data, dict):
+            report.errors.append(RowError(row=number, errors=["Expected a JSON object"]))
+            continue
+        try:
+            valid.append((number, model.model_validate(data)))
+        except ValidationError as error:
+            report.errors.append(RowError(row=number, errors=[
+                f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors()
+            ]))
+    return valid
+
+
+async def insert_key_results(
+    db: AsyncSession, key_results: t.List[t.Dict[str, t.Any]], rollup: ProgressRollup
+):
+    """Insert key results with a single executemany, and count them in their objectives."""
+    ids = (await db.scalars(
+        insert(KeyResult).returning(KeyResult.id, sort_by_parameter_order=True), key_results
+    )).all()
+    record_change(db, "key_results", ids, "create")
+    for id, key_result in zip(ids, key_results):
+        rollup.add(KeyResult(id=id, **key_result))
+
+
+@router.post("/import/objectives")
+async def import_objectives(
+    request: Request,
+    format: ImportFormat = "ndjson",
+    db: AsyncSession = Depends(get_async_db_session),
+) -> ImportReport:
+    """Import objectives, from NDJSON or CSV rows (name, description), in a single transaction.
+
+    NDJSON rows may embed the key results of the objective, in a 'key_results'
+    list. Invalid rows are reported, and skipped. The upload is read, and
+    imported, a batch of rows at a time.
+    """
+    report = ImportReport()
+    rollup = ProgressRollup()
+    rows = parse_rows(read_lines(request.stream()), format)
+    async for batch in batches(rows, IMPORT_BATCH_SIZE):
+        objectives = [obj for _, obj in validate_rows(batch, ObjectiveCreate, report)]
+        if not objectives:
+            continue
+        ids = (await db.scalars(
+            insert(Objective).returning(Objective.id, sort_by_parameter_order=True),
+            [objective.model_dump(exclude={"key_results"}) for objective in objectives],
+        )).all()
+        record_change(db, "objectives", ids, "create")
+        key_results = [
+            {"objective_id": objective_id, **kr.model_dump()}
+            for objective_id, objective in zip(ids, objectives)
+            for kr in objective.key_results
+        ]
+        if key_results:
+            await insert_key_results(db, key_results, rollup)
+        report.imported += len(objectives)
+    await rollup.apply(db)
+    await db.commit()
+    report.errors.sort(key=lambda error: error.row)
+    return report
+
+@router.post("/import/key_results")
+async def import_key_results(
+    request: Request,
+    format: ImportFormat = "ndjson",
+    db: AsyncSession = Depends(get_async_db_session),
+) -> ImportReport:
+    """Import key results of existing objectives, from NDJSON or CSV rows, in one transaction.
+
+    Invalid rows, and rows of objectives that do not exist, are reported and skipped.
+    """
+    report = ImportReport()
+    rollup = ProgressRollup()
+    rows = parse_rows(read_lines(request.stream()), format)
+    async for batch in batches(rows, IMPORT_BATCH_SIZE):
+        valid = validate_rows(batch, KeyResultCreate, report)
+        objective_ids = {kr.objective_id for _, kr in valid}
+        # FOR KEY SHARE, so that the objectives cannot be deleted before the key results land
+        existing = set(await db.scalars(
+            select(Objective.id)
+            .where(Objective.id.in_(objective_ids))
+            .with_for_update(key_share=True)
+        ))
+        key_results = []
+        for number, kr in valid:
+            if kr.objective_id in existing:
+                key_results.append(kr.model_dump())
+            else:
+                report.errors.append(RowError(row=number, errors=[
+                    f"objective_id: Objective {kr.objective_id} not found"
+                ]))
+        if key_results:
+            await insert_key_results(db, key_results, rollup)
+        report.imported += len(key_results)
+    await rollup.apply(db)
+    await db.commit()
+    report.errors.sort(key=lambda error: error.row)
+    return report
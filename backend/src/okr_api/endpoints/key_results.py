@@ -1,35 +1,80 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from ..db import get_db_session
-from ..models2 import KeyResult
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..cache import cache
+from ..changes import record_change
+from ..db import get_async_db_session
+from ..models2 import KeyResult, Objective
+from ..pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, fetch_page
+from ..progress import ProgressRollup
+from ..versions import ETag
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 import typing as t
 
 router = APIRouter()
 
+key_results_etag = ETag("key_results")
+# key results read along with their objective, ie to tell a missing objective apart
+objective_key_results_etag = ETag("key_results", "objectives")
 
-class KeyResultCreate(BaseModel):
+
+def round_progress(progress: t.Optional[float]) -> t.Optional[int]:
+    """Round progress to the whole percentage points stored in the database."""
+    return progress if progress is None else round(progress)
+
+
+class NestedKeyResultCreate(BaseModel):
+    """Encapsulates data for creating a Key Result, along with its Objective."""
+    # lengths and ranges mirror the constraints of the key_results table
+    short_description: t.Optional[str] = Field(None, max_length=255)
+    description: str
+    progress: float = 0
+    metric: t.Optional[str] = Field(None, max_length=255)
+    unit: t.Optional[int] = Field(1, ge=1, le=99)
+    weight: int = Field(1, ge=0)
+
+    _round_progress = field_validator("progress")(round_progress)
+
+class KeyResultCreate(NestedKeyResultCreate):
     """Encapsulates data for creating a Key Result."""
     objective_id: int
-    short_description: t.Optional[str] = None
-    description: str
-    progress: float = 0.0
-    metric: t.Optional[str] = None
-    unit: t.Optional[int] = 1
 
 class KeyResultUpdate(BaseModel):
     """Encapsulates data for updating a Key Result."""
     progress: t.Optional[float] = None
-    short_description: t.Optional[str] = None   
+    short_description: t.Optional[str] = Field(None, max_length=255)
     description: t.Optional[str] = None
+    metric: t.Optional[str] = Field(None, max_length=255)
+    unit: t.Optional[int] = Field(None, ge=1, le=99)
+    weight: t.Optional[int] = Field(None, ge=0)
+
+    _round_progress = field_validator("progress")(round_progress)
+
+class KeyResultBatchUpdate(KeyResultUpdate):
+    """Encapsulates data for updating a Key Result, as an item of a batch."""
+    id: int
+
+
+class KeyResultRead(BaseModel):
+    """Representation of a Key Result in responses, read from the ORM model's attributes."""
+    # frozen, since cached instances are shared across requests
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    objective_id: int
+    short_description: t.Optional[str] = None
+    description: str
+    progress: t.Optional[int] = None
     metric: t.Optional[str] = None
     unit: t.Optional[int] = None
+    weight: int
 
 
 @router.post("/key_results")
 async def create_key_result(
-    key_result: KeyResultCreate, db: Session = Depends(get_db_session)
-) -> t.Dict[str, t.Any]:
+    key_result: KeyResultCreate, db: AsyncSession = Depends(get_async_db_session)
+) -> KeyResultRead:
     """Create a new key result."""
     new_key_result = KeyResult(
         objective_id=key_result.objective_id,
@@ -38,64 +83,128 @@ async def create_key_result(
         progress=key_result.progress,
         metric=key_result.metric,
         unit=key_result.unit,
+        weight=key_result.weight,
     )
     db.add(new_key_result)
-    db.commit()
-    db.refresh(new_key_result)
-    return {
-        "id": new_key_result.id,
-        "objective_id": new_key_result.objective_id,
-        "short_description": new_key_result.short_description,
-        "description": new_key_result.description,
-        "progress": new_key_result.progress,
-        "metric": new_key_result.metric,
-        "unit": new_key_result.unit,
-    }
+    try:
+        await db.flush()  # get the key result id
+    except IntegrityError:
+        # the only constraint the request model does not check: objective_id's foreign key
+        raise HTTPException(status_code=404, detail="Objective not found")
+    record_change(db, "key_results", [new_key_result.id], "create")
+    rollup = ProgressRollup()
+    rollup.add(new_key_result)
+    await rollup.apply(db)
+    await db.commit()
+    await db.refresh(new_key_result)
+    return KeyResultRead.model_validate(new_key_result)
+
+async def fetch_key_results(
+    response: Response,
+    objective_id: t.Optional[int],
+    limit: t.Optional[int],
+    after: t.Optional[str],
+    db: AsyncSession,
+    etag: ETag,
+) -> t.List[KeyResultRead]:
+    """Read a page of key results through the cache, setting the next cursor header.
 
-@router.get("/key_results/")
-async def read_key_results(db: Session = Depends(get_db_session)) -> t.List[t.Dict[str, t.Any]]:
-    """Retrieve all key results."""
-    key_results = db.query(KeyResult).all()
-    return [
-        {
-            "id": kr.id,
-            "objective_id": kr.objective_id,
-            "short_description": kr.short_description,
-            "description": kr.description,
-            "progress": kr.progress,
-            "metric": kr.metric,
-            "unit": kr.unit,
-        }
-        for kr in sorted(key_results, key=lambda x: x.objective_id)
-    ]
-
-@router.get("/key_results/{key_result_id}")
+    Args:
+        etag (ETag): ETag dependency of the endpoint; its tables are part of the
+            cache key, as entries are only served under the versions they were read at.
+    """
+    async def load():
+        query = select(KeyResult)
+        if objective_id is not None:
+            query = query.where(KeyResult.objective_id == objective_id)
+        key_results = await fetch_page(
+            db,
+            query,
+            (KeyResult.objective_id, KeyResult.id),
+            response,
+            limit=limit,
+            after=after,
+        )
+        return [KeyResultRead.model_validate(kr) for kr in key_results], response.headers.get(
+            NEXT_CURSOR_HEADER
+        )
+
+    key_results, next_cursor = await cache.read_through(
+        ("key_results", etag.tables, objective_id, limit, after), [("key_results",)], load
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return key_results
+
+@router.get("/key_results/", dependencies=[Depends(key_results_etag)])
+async def read_key_results(
+    response: Response,
+    objective_id: t.Optional[int] = None,
+    limit: t.Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: t.Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> t.List[KeyResultRead]:
+    """Retrieve all key results, ordered by objective, or only those of one objective.
+
+    Pass a limit to retrieve a single page instead; the cursor to pass as
+    'after', to retrieve the next page, is in the X-Next-Cursor header.
+    """
+    return await fetch_key_results(
+        response, objective_id, limit, after, db, etag=key_results_etag
+    )
+
+@router.get(
+    "/objectives/{objective_id}/key_results",
+    dependencies=[Depends(objective_key_results_etag)],
+)
+async def read_objective_key_results(
+    objective_id: int,
+    response: Response,
+    limit: t.Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: t.Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> t.List[KeyResultRead]:
+    """Retrieve the key results of an objective, ordered by ID."""
+    key_results = await fetch_key_results(
+        response, objective_id, limit, after, db, etag=objective_key_results_etag
+    )
+    # tell an objective without key results apart from a missing one
+    if not key_results and after is None and not await db.get(Objective, objective_id):
+        raise HTTPException(status_code=404, detail="Objective not found")
+    return key_results
+
+@router.get("/key_results/{key_result_id}", dependencies=[Depends(key_results_etag)])
 async def read_key_result(
-    key_result_id: int, db: Session = Depends(get_db_session)
-) -> t.Dict[str, t.Any]:
+    key_result_id: int, db: AsyncSession = Depends(get_async_db_session)
+) -> KeyResultRead:
     """Retrieve a key result by ID."""
-    key_result = db.query(KeyResult).filter(KeyResult.id == key_result_id).first()
-    if not key_result:
-        raise HTTPException(status_code=404, detail="Key result not found")
-    return {
-        "id": key_result.id,
-        "objective_id": key_result.objective_id,
-        "short_description": key_result.short_description,
-        "description": key_result.description,
-        "progress": key_result.progress,
-        "metric": key_result.metric,
-        "unit": key_result.unit,
-    }
+    async def load():
+        key_result = await db.get(KeyResult, key_result_id)
+        if not key_result:
+            raise HTTPException(status_code=404, detail="Key result not found")
+        return KeyResultRead.model_validate(key_result)
+
+    return await cache.read_through(
+        ("key_result", key_result_id), [("key_results", key_result_id)], load
+    )
 
 @router.put("/key_results/{key_result_id}")
 async def update_key_result(
-    key_result_id: int, key_result: KeyResultUpdate, db: Session = Depends(get_db_session)
-) -> t.Dict[str, t.Any]:
+    key_result_id: int,
+    key_result: KeyResultUpdate,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> KeyResultRead:
     """Update a key result by ID."""
-    existing_key_result = db.query(KeyResult).filter(KeyResult.id == key_result_id).first()
+    # lock the row, so that concurrent updates roll up progress changes one after the other
+    existing_key_result = await db.get(KeyResult, key_result_id, with_for_update=True)
     if not existing_key_result:
         raise HTTPException(status_code=404, detail="Key result not found")
 
+    record_change(
+        db, "key_results", [key_result_id], "update", key_result.model_dump(exclude_none=True)
+    )
+    rollup = ProgressRollup()
+    rollup.subtract(existing_key_result)
     if key_result.progress is not None:
         existing_key_result.progress = key_result.progress
     if key_result.description is not None:
@@ -106,27 +215,68 @@ async def update_key_result(
         existing_key_result.short_description = key_result.short_description
     if key_result.unit is not None:
         existing_key_result.unit = key_result.unit
+    if key_result.weight is not None:
+        existing_key_result.weight = key_result.weight
+    rollup.add(existing_key_result)
+    await rollup.apply(db)
 
-    db.commit()
-    db.refresh(existing_key_result)
-    return {
-        "id": existing_key_result.id,
-        "objective_id": existing_key_result.objective_id,
-        "short_description": existing_key_result.short_description,
-        "description": existing_key_result.description,
-        "progress": existing_key_result.progress,
-        "metric": existing_key_result.metric,
-        "unit": existing_key_result.unit,
+    await db.commit()
+    await db.refresh(existing_key_result)
+    return KeyResultRead.model_validate(existing_key_result)
+
+@router.patch("/key_results")
+async def update_key_results(
+    key_results: t.List[KeyResultBatchUpdate], db: AsyncSession = Depends(get_async_db_session)
+) -> t.List[KeyResultRead]:
+    """Update many key results in a single transaction, ie for a progress check-in.
+
+    Fields left out (or null) are not changed. Either all key results are
+    updated or, if any of them does not exist, none.
+
+    Returns:
+        List[KeyResultRead]: The updated key results, ordered by ID.
+    """
+    ids = [kr.id for kr in key_results]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Key result IDs must be unique in a batch")
+    existing = {
+        kr.id: kr
+        for kr in await db.scalars(
+            select(KeyResult).where(KeyResult.id.in_(ids)).with_for_update()
+        )
     }
+    missing = sorted(set(ids) - set(existing))
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Key results not found: {missing}")
+
+    rollup = ProgressRollup()
+    for change in key_results:
+        key_result = existing[change.id]
+        values = change.model_dump(exclude={"id"}, exclude_none=True)
+        record_change(db, "key_results", [change.id], "update", values)
+        rollup.subtract(key_result)
+        for field, value in values.items():
+            setattr(key_result, field, value)
+        rollup.add(key_result)
+    # the flush batches the UPDATEs of key results changing the same fields into an executemany
+    await db.flush()
+    await rollup.apply(db)
+    await db.commit()
+    updated = sorted(existing.values(), key=lambda kr: kr.id)
+    return [KeyResultRead.model_validate(kr) for kr in updated]
 
 @router.delete("/key_results/{key_result_id}")
 async def delete_key_result(
-    key_result_id: int, db: Session = Depends(get_db_session)
+    key_result_id: int, db: AsyncSession = Depends(get_async_db_session)
 ) -> t.Dict[str, str]:
     """Delete a key result by ID."""
-    key_result = db.query(KeyResult).filter(KeyResult.id == key_result_id).first()
+    key_result = await db.get(KeyResult, key_result_id, with_for_update=True)
     if not key_result:
         raise HTTPException(status_code=404, detail="Key result not found")
-    db.delete(key_result)
-    db.commit()
+    record_change(db, "key_results", [key_result_id], "delete")
+    rollup = ProgressRollup()
+    rollup.subtract(key_result)
+    await db.delete(key_result)
+    await rollup.apply(db)
+    await db.commit()
     return {"message": f"Key result {key_result_id} deleted successfully"}
@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..metrics import metrics
+
+router = APIRouter()
+
+
+class PrometheusResponse(PlainTextResponse):
+    media_type = "text/plain; version=0.0.4"
+
+
+@router.get("/metrics", response_class=PrometheusResponse, include_in_schema=False)
+async def read_metrics() -> str:
+    """Report request latency, status counts and database time per route, for Prometheus."""
+    return metrics.to_prometheus()
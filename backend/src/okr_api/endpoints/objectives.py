@@ -1,8 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from ..db import get_db_session
-from ..models2 import Objective
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from ..cache import cache
+from ..changes import record_change
+from ..db import get_async_db_session
+from ..models2 import KeyResult, Objective
+from .key_results import KeyResultRead, NestedKeyResultCreate
+from ..pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, fetch_page
+from ..progress import ProgressRollup
+from ..versions import ETag
+from pydantic import BaseModel, ConfigDict, Field
 import typing as t
 
 router = APIRouter()
@@ -13,9 +21,11 @@ class ObjectiveCreate(BaseModel):
     Args:
         name (str): Name of the objective.
         description (str): Description of the objective.
+        key_results (List[NestedKeyResultCreate]): Key Results to create with the objective.
     """
-    name: str
+    name: str = Field(max_length=255)
     description: str
+    key_results: t.List[NestedKeyResultCreate] = []
 
 class ObjectiveUpdate(BaseModel):
     """Encapsulates data for updating an Objective.
@@ -24,97 +34,190 @@ class ObjectiveUpdate(BaseModel):
         name (Optional[str]): Updated name of the objective.
         description (Optional[str]): Updated description of the objective.
     """
-    name: t.Optional[str] = None
+    name: t.Optional[str] = Field(None, max_length=255)
     description: t.Optional[str] = None
 
+
+class ObjectiveRead(BaseModel):
+    """Representation of an Objective in responses, read from the ORM model's attributes."""
+    # frozen, since cached instances are shared across requests
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    name: str
+    description: str
+    progress: t.Optional[int] = None
+
+class ObjectiveWithKeyResults(ObjectiveRead):
+    """Representation of an Objective in responses, embedding its Key Results."""
+    key_results: t.List[KeyResultRead]
+
+class ObjectiveProgress(BaseModel):
+    """Progress of an Objective, rolled up from its Key Results."""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    progress: t.Optional[int] = None
+
+
+Include = t.Optional[t.Literal["key_results"]]
+"""Related entities that can be embedded in objective responses"""
+
+# the subclass first, so that objectives with key results serialize them
+ObjectiveResponse = t.Union[ObjectiveWithKeyResults, ObjectiveRead]
+
+
+def objective_response(objective: Objective, include: Include = None) -> ObjectiveResponse:
+    """Represent an Objective in responses, with any included relations."""
+    if include == "key_results":
+        return ObjectiveWithKeyResults.model_validate(objective)
+    return ObjectiveRead.model_validate(objective)
+
+
+def include_options(include: Include) -> t.List[t.Any]:
+    """Loader options fetching the included relations in a single extra query."""
+    return [selectinload(Objective.key_results)] if include == "key_results" else []
+
+
+def include_tags(include: Include) -> t.List[t.Tuple[str, ...]]:
+    """Cache tags of the included relations, so that writes to them invalidate entries."""
+    return [("key_results",)] if include == "key_results" else []
+
+
+objectives_etag = ETag("objectives", include={"key_results": "key_results"})
+
+
 @router.post("/objectives")
 async def create_objective(
-    objective: ObjectiveCreate, db: Session = Depends(get_db_session)
-) -> t.Dict[str, t.Any]:
-    """Create a new objective."""
+    objective: ObjectiveCreate, db: AsyncSession = Depends(get_async_db_session)
+) -> ObjectiveWithKeyResults:
+    """Create a new objective, along with its key results, in a single transaction."""
     new_objective = Objective(name=objective.name, description=objective.description)
     db.add(new_objective)
-    db.commit()
-    db.refresh(new_objective)
-    return {
-        "id": new_objective.id,
-        "name": new_objective.name,
-        "description": new_objective.description,
-        "progress": new_objective.progress,
-    }
-
-@router.get("/objectives/")
+    await db.flush()  # get the objective id, to reference from its key results
+    record_change(db, "objectives", [new_objective.id], "create")
+    key_results = []
+    if objective.key_results:
+        # single multi-row INSERT .. RETURNING, instead of one INSERT per key result
+        key_results = (await db.scalars(
+            insert(KeyResult).returning(KeyResult),
+            [
+                {"objective_id": new_objective.id, **kr.model_dump()}
+                for kr in objective.key_results
+            ],
+        )).all()
+        record_change(db, "key_results", [kr.id for kr in key_results], "create")
+        rollup = ProgressRollup()
+        for kr in key_results:
+            rollup.add(kr)
+        await rollup.apply(db)
+    await db.commit()
+    await db.refresh(new_objective)
+    return ObjectiveWithKeyResults(
+        **ObjectiveRead.model_validate(new_objective).model_dump(),
+        key_results=[KeyResultRead.model_validate(kr) for kr in key_results],
+    )
+
+@router.get("/objectives/", dependencies=[Depends(objectives_etag)])
 async def read_objectives(
-    db: Session = Depends(get_db_session)
-) -> t.List[t.Dict[str, t.Any]]:
-    """Retrieve all objectives."""
-    objectives = db.query(Objective).all()
-    return [
-        {
-            "id": obj.id,
-            "name": obj.name,
-            "description": obj.description,
-            "progress": obj.progress,
-        }
-        for obj in objectives
-    ]
-
-@router.get("/objectives/{objective_id}")
+    response: Response,
+    limit: t.Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: t.Optional[str] = None,
+    include: Include = None,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> t.List[ObjectiveResponse]:
+    """Retrieve all objectives, ordered by ID.
+
+    Pass a limit to retrieve a single page instead; the cursor to pass as
+    'after', to retrieve the next page, is in the X-Next-Cursor header.
+    Pass include=key_results to embed the key results of each objective.
+    """
+    async def load():
+        objectives = await fetch_page(
+            db,
+            select(Objective).options(*include_options(include)),
+            (Objective.id,),
+            response,
+            limit=limit,
+            after=after,
+        )
+        return [objective_response(obj, include) for obj in objectives], response.headers.get(
+            NEXT_CURSOR_HEADER
+        )
+
+    objectives, next_cursor = await cache.read_through(
+        ("objectives", limit, after, include), [("objectives",), *include_tags(include)], load
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return objectives
+
+@router.get("/objectives/{objective_id}", dependencies=[Depends(objectives_etag)])
 async def read_objective(
-    objective_id: int, db: Session = Depends(get_db_session)
-) -> t.Dict[str, t.Any]:
-    """Retrieve an objective by ID."""
-    objective = db.query(Objective).filter(Objective.id == objective_id).first()
-    if not objective:
-        raise HTTPException(status_code=404, detail="Objective not found")
-    return {
-        "id": objective.id,
-        "name": objective.name,
-        "description": objective.description,
-        "progress": objective.progress,
-    }
+    objective_id: int,
+    include: Include = None,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> ObjectiveResponse:
+    """Retrieve an objective by ID, optionally with its key results."""
+    async def load():
+        objective = await db.get(Objective, objective_id, options=include_options(include))
+        if not objective:
+            raise HTTPException(status_code=404, detail="Objective not found")
+        return objective_response(objective, include)
+
+    return await cache.read_through(
+        ("objective", objective_id, include),
+        [("objectives", objective_id), *include_tags(include)],
+        load,
+    )
 
 @router.put("/objectives/{objective_id}")
 async def update_objective(
-    objective_id: int, objective: ObjectiveUpdate, db: Session = Depends(get_db_session)
-) -> t.Dict[str, t.Any]:
+    objective_id: int,
+    objective: ObjectiveUpdate,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> ObjectiveRead:
     """Update an objective by ID."""
-    existing_objective = db.query(Objective).filter(Objective.id == objective_id).first()
+    existing_objective = await db.get(Objective, objective_id)
     if not existing_objective:
         raise HTTPException(status_code=404, detail="Objective not found")
 
+    record_change(
+        db, "objectives", [objective_id], "update", objective.model_dump(exclude_none=True)
+    )
     if objective.name is not None:
         existing_objective.name = objective.name
     if objective.description is not None:
         existing_objective.description = objective.description
 
-    db.commit()
-    db.refresh(existing_objective)
-    return {
-        "id": existing_objective.id,
-        "name": existing_objective.name,
-        "description": existing_objective.description,
-        "progress": existing_objective.progress,
-    }
+    await db.commit()
+    await db.refresh(existing_objective)
+    return ObjectiveRead.model_validate(existing_objective)
 
 @router.delete("/objectives/{objective_id}")
 async def delete_objective(
-    objective_id: int, db: Session = Depends(get_db_session)
+    objective_id: int, db: AsyncSession = Depends(get_async_db_session)
 ) -> t.Dict[str, str]:
     """Delete an objective by ID."""
-    objective = db.query(Objective).filter(Objective.id == objective_id).first()
+    objective = await db.get(Objective, objective_id)
     if not objective:
         raise HTTPException(status_code=404, detail="Objective not found")
-    db.delete(objective)
-    db.commit()
+    record_change(db, "objectives", [objective_id], "delete")
+    # its key results go too, by the ON DELETE CASCADE
+    key_result_ids = await db.scalars(
+        select(KeyResult.id).where(KeyResult.objective_id == objective_id)
+    )
+    record_change(db, "key_results", key_result_ids, "delete")
+    await db.delete(objective)
+    await db.commit()
     return {"message": f"Objective {objective_id} deleted successfully"}
 
-@router.get("/objectives/{objective_id}/progress")
+@router.get("/objectives/{objective_id}/progress", dependencies=[Depends(objectives_etag)])
 async def calculate_progress(
-    objective_id: int, db: Session = Depends(get_db_session)
-) -> t.Dict[str, t.Any]:
-    """Calculate and retrieve the progress of an objective."""
-    objective = db.query(Objective).filter(Objective.id == objective_id).first()
+    objective_id: int, db: AsyncSession = Depends(get_async_db_session)
+) -> ObjectiveProgress:
+    """Retrieve the progress of an objective, rolled up from its key results on every write."""
+    objective = await db.get(Objective, objective_id)
     if not objective:
         raise HTTPException(status_code=404, detail="Objective not found")
-    return {"id": objective.id, "progress": objective.progress}
+    return ObjectiveProgress.model_validate(objective)
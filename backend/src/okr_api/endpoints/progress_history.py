@@ -0,0 +1,100 @@
+import math
+import typing as t
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db import get_async_db_session
+from ..models2 import KeyResult, ProgressHistory
+
+router = APIRouter()
+
+
+MAX_BUCKETS = 1000
+
+DEFAULT_RANGE = timedelta(days=90)
+"""Time range of the history served, when the request sets no start"""
+
+
+class ProgressBucket(BaseModel):
+    """Progress of a Key Result during a time bucket, downsampled from its history.
+
+    Args:
+        start (datetime): Start of the bucket (UTC).
+        count (int): Number of progress changes recorded in the bucket.
+        min (int): Lowest progress recorded in the bucket.
+        max (int): Highest progress recorded in the bucket.
+        avg (float): Average progress recorded in the bucket.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    start: datetime
+    count: int
+    min: int
+    max: int
+    avg: float
+
+
+def as_utc(moment: datetime) -> datetime:
+    """Convert a datetime to UTC, taking naive ones to already be in UTC."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+@router.get("/key_results/{key_result_id}/progress_history")
+async def read_progress_history(
+    key_result_id: int,
+    start: t.Optional[datetime] = None,
+    end: t.Optional[datetime] = None,
+    buckets: int = Query(50, ge=1, le=MAX_BUCKETS),
+    db: AsyncSession = Depends(get_async_db_session),
+) -> t.List[ProgressBucket]:
+    """Retrieve the progress history of a key result over a time range, in fixed buckets.
+
+    The range [start, end) is split into equal buckets, each summarizing the
+    progress changes recorded in it; buckets without changes are left out.
+    End defaults to now and start to 90 days before end.
+    """
+    end = as_utc(end) if end else datetime.now(timezone.utc)
+    start = as_utc(start) if start else end - DEFAULT_RANGE
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if not await db.get(KeyResult, key_result_id):
+        raise HTTPException(status_code=404, detail="Key result not found")
+
+    # bucket of a row: whole seconds since start, divided by the bucket width in seconds
+    origin = math.floor(start.timestamp())
+    width = max(1, math.ceil((end.timestamp() - origin) / buckets))
+    # floored, as a cast alone rounds fractional epochs (on Postgres), past the last bucket
+    epoch = cast(func.floor(func.extract("epoch", ProgressHistory.recorded_at)), BigInteger)
+    bucket = ((epoch - origin) // width).label("bucket")
+    rows = await db.execute(
+        select(
+            bucket,
+            func.count(),
+            func.min(ProgressHistory.progress),
+            func.max(ProgressHistory.progress),
+            func.avg(ProgressHistory.progress),
+        )
+        .where(
+            ProgressHistory.key_result_id == key_result_id,
+            ProgressHistory.recorded_at >= start,
+            ProgressHistory.recorded_at < end,
+        )
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+    return [
+        ProgressBucket(
+            start=datetime.fromtimestamp(origin + index * width, timezone.utc),
+            count=count,
+            min=low,
+            max=high,
+            avg=round(float(avg), 2),
+        )
+        for index, count, low, high, avg in rows
+    ]
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db import get_async_db_session
+from ..pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from ..search import search_query
+import typing as t
+
+router = APIRouter()
+
+
+class SearchHit(BaseModel):
+    """An Objective or Key Result matching a search.
+
+    Args:
+        type (str): 'objective' or 'key_result'.
+        id (int): ID of the objective or key result.
+        objective_id (int): ID of the objective, or of the key result's objective.
+        title (str): Name of the objective, or (short) description of the key result.
+        description (str): Description of the objective or key result.
+        rank (float): Relevance to the search; higher is better.
+    """
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    type: t.Literal["objective", "key_result"]
+    id: int
+    objective_id: int
+    title: str
+    description: str
+    rank: float
+
+
+@router.get("/search")
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    after: t.Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db_session),
+) -> t.List[SearchHit]:
+    """Search objectives and key results by their text, best matches first.
+
+    The cursor to pass as 'after', to retrieve the next page of hits, is in
+    the X-Next-Cursor header.
+    """
+    if not q.split():
+        # no words (ie only spaces): nothing to match, and an FTS5 syntax error
+        return []
+    # hits are ordered by rank, not by a unique key, so the cursor carries the offset
+    offset = decode_cursor(after, 1)[0] if after else 0
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    dialect = (await db.connection()).dialect.name
+    rows = (await db.execute(search_query(dialect, q, limit + 1, offset))).all()
+    if len(rows) > limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(offset + limit)
+    return [SearchHit.model_validate(row) for row in rows[:limit]]
@@ -0,0 +1,199 @@
+"""Request latency and database time metrics, per route, in Prometheus text format
+
+An ASGI middleware times every HTTP request, and counts its responses by
+status; SQLAlchemy cursor events add the number and duration of the queries
+each request runs, so that slow routes can be told apart as slow in Python
+or in the database. Metrics are kept per process (ie per server worker).
+"""
+import contextvars
+import threading
+import time
+import typing as t
+from bisect import bisect_left
+from collections import defaultdict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+"""Upper bounds (seconds) of the histogram buckets, besides +Inf"""
+
+UNMATCHED_ROUTE = "<unmatched>"
+"""Route label of the requests matching no route, to keep the number of labels bounded"""
+
+
+class Histogram:
+    """Counts of observed values, per bucket of values, along with their sum.
+
+    Args:
+        buckets (Sequence[float]): Upper bounds of the buckets, in increasing order.
+    """
+
+    def __init__(self, buckets: t.Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one for +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Count a value, in the first bucket whose upper bound it does not exceed."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        """Number of values observed."""
+        return sum(self.counts)
+
+    def cumulative_counts(self) -> t.List[t.Tuple[str, int]]:
+        """Number of values up to each upper bound ('le' label), as Prometheus reports them."""
+        bounds = [repr(bound) for bound in self.buckets] + ["+Inf"]
+        cumulative, total = [], 0
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+
+class RequestStats:
+    """Database usage of a single request, accumulated by the cursor events."""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current_request: contextvars.ContextVar[t.Optional[RequestStats]] = contextvars.ContextVar(
+    "okr_api.request_stats", default=None
+)
+
+
+RouteKey = t.Tuple[str, str]
+"""Method and route (path template, ie /objectives/{objective_id}) of requests"""
+
+
+class Metrics:
+    """Registry of the metrics of the requests served by the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: t.Dict[RouteKey, Histogram] = defaultdict(Histogram)
+        self.db_time: t.Dict[RouteKey, Histogram] = defaultdict(Histogram)
+        self.queries: t.Dict[RouteKey, int] = defaultdict(int)
+        self.responses: t.Dict[t.Tuple[str, str, int], int] = defaultdict(int)
+
+    def record(
+        self, method: str, route: str, status: int, seconds: float, stats: RequestStats
+    ):
+        """Record a request served: its latency, status and database usage."""
+        key = (method, route)
+        with self._lock:
+            self.latency[key].observe(seconds)
+            self.db_time[key].observe(stats.db_seconds)
+            self.queries[key] += stats.queries
+            self.responses[(method, route, status)] += 1
+
+    def clear(self):
+        """Forget every request recorded."""
+        with self._lock:
+            for metric in (self.latency, self.db_time, self.queries, self.responses):
+                metric.clear()
+
+    def to_prometheus(self) -> str:
+        """The metrics, in Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            lines = []
+            for name, help, histograms in (
+                ("okr_api_request_duration_seconds", "Latency of requests.", self.latency),
+                (
+                    "okr_api_request_db_duration_seconds",
+                    "Time requests spent running database queries.",
+                    self.db_time,
+                ),
+            ):
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} histogram"]
+                for (method, route), histogram in sorted(histograms.items()):
+                    labels = f'method="{method}",route="{_escape(route)}"'
+                    for bound, count in histogram.cumulative_counts():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.sum!r}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+            name = "okr_api_db_queries_total"
+            lines += [
+                f"# HELP {name} Database queries run by requests.", f"# TYPE {name} counter"
+            ]
+            for (method, route), count in sorted(self.queries.items()):
+                lines.append(f'{name}{{method="{method}",route="{_escape(route)}"}} {count}')
+            name = "okr_api_requests_total"
+            lines += [f"# HELP {name} Requests served, by status.", f"# TYPE {name} counter"]
+            for (method, route, status), count in sorted(self.responses.items()):
+                labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+                lines.append(f"{name}{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+"""Metrics of the requests served by the process"""
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the latency, status and database usage of HTTP requests.
+
+    Latency runs until the response is fully sent, so it includes streaming.
+
+    Args:
+        app (ASGIApp): The application to time.
+        registry (Metrics): Where to record the requests.
+    """
+
+    def __init__(self, app: t.Any, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: t.Dict[str, t.Any], receive: t.Any, send: t.Any):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500  # unless a response starts
+        stats = RequestStats()
+        token = _current_request.set(stats)
+
+        async def send_status(message: t.Dict[str, t.Any]):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            seconds = time.perf_counter() - start
+            _current_request.reset(token)
+            # the route matched, set in the scope by the router
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            self.registry.record(scope["method"], path, status, seconds, stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current_request.get() is not None:
+        context._okr_api_query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    start = getattr(context, "_okr_api_query_start", None)
+    if stats is not None and start is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - start
@@ -1,6 +1,9 @@
 """ORM - Declarative Data models in SQL Alchemy"""
-from sqlalchemy import Column, String, Text, Integer, ForeignKey
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import (
+    DDL, BigInteger, Column, DateTime, String, Table, Text, Integer, ForeignKey, Index, event,
+    func,
+)
+from sqlalchemy.orm import declarative_base, relationship
 
 
 Base = declarative_base()
@@ -14,7 +17,22 @@ class Objective(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
+    # weighted average of the progress of the key results, see okr_api.progress
     progress = Column(Integer, nullable=True, server_default="0")
+    # running sums of weight * progress and of weight, over the key results, to update in O(1)
+    progress_sum = Column(BigInteger, nullable=False, server_default="0")
+    weight_sum = Column(BigInteger, nullable=False, server_default="0")
+
+    # never lazy-load: key results must be eagerly loaded (ie selectinload) when needed
+    key_results = relationship(
+        "KeyResult",
+        back_populates="objective",
+        order_by="KeyResult.id",
+        cascade="all, delete-orphan",
+        # leave deleting key results of a deleted objective to the ON DELETE CASCADE
+        passive_deletes=True,
+        lazy="raise",
+    )
 
 
 class KeyResult(Base):
@@ -22,10 +40,115 @@ class KeyResult(Base):
     __tablename__ = 'key_results'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    objective_id = Column(Integer, ForeignKey('objectives.id', ondelete='CASCADE'), nullable=False)
+    # indexed, since Postgres does not index foreign keys, and we look up key results by it
+    objective_id = Column(
+        Integer, ForeignKey('objectives.id', ondelete='CASCADE'), nullable=False, index=True
+    )
     description = Column(Text, nullable=False)
     # title-like short description
     short_description = Column(String(255), nullable=True)
     progress = Column(Integer, nullable=True, server_default="0")
     metric = Column(String(255), nullable=True)
     unit = Column(Integer, nullable=True, server_default="1")
+    # relative importance, when rolling up progress to the objective
+    weight = Column(Integer, nullable=False, server_default="1")
+
+    objective = relationship("Objective", back_populates="key_results", lazy="raise")
+
+
+class ProgressHistory(Base):
+    """Database model for the (append-only) history of Key Results' progress."""
+    __tablename__ = 'progress_history'
+
+    # SQLite only autoincrements INTEGER primary keys
+    id = Column(
+        BigInteger().with_variant(Integer, 'sqlite'), primary_key=True, autoincrement=True
+    )
+    key_result_id = Column(
+        Integer, ForeignKey('key_results.id', ondelete='CASCADE'), nullable=False
+    )
+    progress = Column(Integer, nullable=False)
+    recorded_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # the history of a key result, over a time range
+        Index('ix_progress_history_key_result_id_recorded_at', 'key_result_id', 'recorded_at'),
+        # tiny index, since rows are appended in recorded_at order; Postgres only
+        Index(
+            'ix_progress_history_recorded_at', 'recorded_at', postgresql_using='brin'
+        ).ddl_if(dialect='postgresql'),
+    )
+
+
+class TableVersion(Base):
+    """Database model for the version counters of tables, bumped by every write to them."""
+    __tablename__ = 'table_versions'
+
+    table_name = Column(String(63), primary_key=True)
+    version = Column(BigInteger, nullable=False, server_default="0")
+
+
+SEARCH_COLUMNS = {
+    "objectives": ("name", "description"),
+    "key_results": ("short_description", "description"),
+}
+"""Text columns of tables indexed for full-text search, most relevant first (okr_api.search)"""
+
+
+def search_ddl(table: str, columns: tuple) -> dict:
+    """DDL statements indexing a table for full-text search, per database backend (dialect).
+
+    On Postgres, a generated tsvector column, search_vector, with a GIN index.
+    On SQLite, an FTS5 table mirroring the columns, kept in sync by triggers.
+    """
+    weighted = " || ".join(
+        f"setweight(to_tsvector('english', coalesce({column}, '')), '{weight}')"
+        for column, weight in zip(columns, "AB")
+    )
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    fts = f"{table}_fts"
+    insert_new = f"INSERT INTO {fts} (rowid, {names}) VALUES (new.id, {new_values});"
+    delete_old = (
+        f"INSERT INTO {fts} ({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values});"
+    )
+    return {
+        "postgresql": [
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({weighted}) STORED",
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} "
+            "USING GIN (search_vector)",
+        ],
+        "sqlite": [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            # stemming words in english, as Postgres does
+            f"{names}, content='{table}', content_rowid='id', tokenize='porter unicode61')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} "
+            f"BEGIN {insert_new} END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} "
+            f"BEGIN {delete_old} END",
+            # only when indexed columns change, not on every progress update
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {names} ON {table} "
+            f"BEGIN {delete_old} {insert_new} END",
+        ],
+    }
+
+
+def listen_search_ddl(table: Table, columns: tuple):
+    """Create the full-text search index of a table along with it, on every database backend.
+
+    Kept out of the mapped columns, since the index differs per database backend.
+    """
+    for dialect, statements in search_ddl(table.name, columns).items():
+        for statement in statements:
+            event.listen(table, "after_create", DDL(statement).execute_if(dialect=dialect))
+    event.listen(
+        table,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {table.name}_fts").execute_if(dialect="sqlite"),
+    )
+
+
+for table_name, search_columns in SEARCH_COLUMNS.items():
+    listen_search_ddl(metadata.tables[table_name], search_columns)
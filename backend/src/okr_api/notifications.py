@@ -0,0 +1,144 @@
+"""Sharing of committed changes across API processes, through Postgres LISTEN/NOTIFY
+
+Every transaction that records changes (see okr_api.changes) also issues a
+NOTIFY with them, which Postgres delivers to the listeners only once, and
+only if, the transaction commits. Each API process (worker) listens, and
+publishes the changes of the other processes as if committed locally, so
+that it invalidates its cache and streams the changes to its clients.
+"""
+import asyncio
+import json
+import logging
+import typing as t
+import uuid
+
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from .changes import Change, pending_changes, publish
+
+
+logger = logging.getLogger(__name__)
+
+
+CHANNEL = "okr_api_changes"
+
+MAX_PAYLOAD_BYTES = 7900
+"""Size of a notification payload, within the 8000 bytes Postgres allows"""
+
+PROCESS_ID = uuid.uuid4().hex
+"""Tells the notifications of this process apart, to skip them when received"""
+
+
+def to_payloads(changes: t.Sequence[Change], origin: str = PROCESS_ID) -> t.List[str]:
+    """Encode changes into as few notification payloads as fit them."""
+    prefix = f'{{"origin":"{origin}","changes":['
+    payloads: t.List[str] = []
+    items: t.List[str] = []
+    size = len(prefix) + 2
+    for change in changes:
+        item = json.dumps([change.table, change.id, change.op, change.fields])
+        if items and size + len(item) + 1 > MAX_PAYLOAD_BYTES:
+            payloads.append(prefix + ",".join(items) + "]}")
+            items, size = [], len(prefix) + 2
+        items.append(item)
+        size += len(item) + 1
+    if items:
+        payloads.append(prefix + ",".join(items) + "]}")
+    return payloads
+
+
+def from_payload(payload: str) -> t.Tuple[str, t.List[Change]]:
+    """Decode a notification payload into the process it came from and its changes."""
+    data = json.loads(payload)
+    return data["origin"], [
+        Change(table, id, op, tuple(fields)) for table, id, op, fields in data["changes"]
+    ]
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_changes(session: Session):
+    changes = pending_changes(session)
+    if not changes or session.get_bind().dialect.name != "postgresql":
+        return
+    for payload in to_payloads(changes):
+        session.execute(select(func.pg_notify(CHANNEL, payload)))
+
+
+class ChangeListener:
+    """Listens to the changes notified by other processes, over a dedicated connection.
+
+    Reconnects whenever the connection drops; since notifications sent in the
+    meantime are lost, on_reconnect is called then, to drop any local state.
+
+    Args:
+        url (str): URL of the (Postgres) database.
+        on_changes (Callable[[List[Change]], None]): Called with the changes of another process.
+        on_reconnect (Callable[[], None]): Called once listening again, after a disconnection.
+        retry_seconds (float): Wait before reconnecting.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        on_changes: t.Callable[[t.List[Change]], None] = publish,
+        on_reconnect: t.Callable[[], None] = lambda: None,
+        retry_seconds: float = 1.0,
+    ):
+        # plain libpq-style URL, as asyncpg takes it
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self.on_changes = on_changes
+        self.on_reconnect = on_reconnect
+        self.retry_seconds = retry_seconds
+        self._task: t.Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start listening, in a background task."""
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """Stop listening and close the connection."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _on_notification(self, connection: t.Any, pid: int, channel: str, payload: str):
+        try:
+            origin, changes = from_payload(payload)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed change notification: %.200s", payload)
+            return
+        if origin != PROCESS_ID:
+            self.on_changes(changes)
+
+    async def _listen(self):
+        listened_before = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(CHANNEL, self._on_notification)
+                if listened_before:
+                    self.on_reconnect()
+                listened_before = True
+                await lost.wait()
+                logger.warning("Lost the change notifications connection, reconnecting")
+                continue
+            except (OSError, asyncpg.PostgresError) as error:
+                logger.warning("Cannot listen to change notifications, retrying: %s", error)
+            except Exception:
+                # whatever fails, keep listening: invalidation across workers depends on it
+                logger.exception("Failed listening to change notifications, retrying")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    connection.terminate()
+            await asyncio.sleep(self.retry_seconds)
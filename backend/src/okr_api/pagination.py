@@ -0,0 +1,92 @@
+"""Keyset (cursor) pagination of list endpoints"""
+import base64
+import binascii
+import json
+import typing as t
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+"""Response header carrying the cursor of the next page, absent on the last page"""
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(*values: int) -> str:
+    """Encode the sort key values of the last row of a page into an opaque cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> t.Tuple[int, ...]:
+    """Decode a cursor created by encode_cursor, back into sort key values.
+
+    Args:
+        cursor (str): The opaque cursor, as received from the client.
+        length (int): Number of sort key values the cursor should carry.
+
+    Raises:
+        HTTPException: 400 error, if the cursor is malformed.
+
+    Returns:
+        Tuple[int, ...]: The sort key values of the row to continue after.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        values = None
+    if (
+        not isinstance(values, list)
+        or len(values) != length
+        or not all(type(value) is int for value in values)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return tuple(values)
+
+
+async def fetch_page(
+    db: AsyncSession,
+    query: Select,
+    keys: t.Sequence[t.Any],
+    response: Response,
+    limit: t.Optional[int] = None,
+    after: t.Optional[str] = None,
+) -> t.Sequence[t.Any]:
+    """Fetch the rows of a query, ordered by keys, optionally as a single page.
+
+    Call this to let the database do the ordering and the skipping of the rows
+    of previous pages (seek method), instead of loading all rows. When there
+    are more rows after the page, the cursor to request them with is set in
+    the X-Next-Cursor response header.
+
+    Args:
+        db (AsyncSession): Session to execute the query with.
+        query (Select): Query selecting ORM entities.
+        keys (Sequence): Columns making up a unique sort key, ie (objective_id, id).
+        response (Response): Response to set the next page cursor header on.
+        limit (Optional[int]): Page size; all rows are returned when None.
+        after (Optional[str]): Cursor of the previous page, to continue after.
+
+    Returns:
+        Sequence: The entities of the page.
+    """
+    query = query.order_by(*keys)
+    if after is not None:
+        values = decode_cursor(after, len(keys))
+        if len(keys) > 1:
+            query = query.where(tuple_(*keys) > tuple_(*values))
+        else:
+            query = query.where(keys[0] > values[0])
+    if limit is not None:
+        # fetch one extra row to find out if a next page exists
+        query = query.limit(limit + 1)
+    rows = (await db.scalars(query)).all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            *(getattr(rows[-1], key.key) for key in keys)
+        )
+    return rows
@@ -0,0 +1,78 @@
+"""Connection Pool instrumentation, to size the pool and detect exhaustion"""
+import threading
+import time
+import typing as t
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class CheckoutStats:
+    """Accumulates how long callers waited to check out a connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.timeouts = 0
+
+    def record(self, seconds: float, timed_out: bool = False):
+        """Record a single checkout attempt."""
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            self.timeouts += timed_out
+
+    def snapshot(self) -> t.Dict[str, t.Any]:
+        """Current counters, as a JSON-able dictionary."""
+        with self._lock:
+            return {
+                "count": self.count,
+                "total_seconds": self.total_seconds,
+                "avg_seconds": self.total_seconds / self.count if self.count else 0.0,
+                "max_seconds": self.max_seconds,
+                "timeouts": self.timeouts,
+            }
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue Pool for async engines, reporting checkout wait times."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.checkout_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.checkout_stats.record(time.perf_counter() - start)
+        return connection
+
+
+def pool_status(pool: AsyncAdaptedQueuePool) -> t.Dict[str, t.Any]:
+    """Report the live state of a connection pool.
+
+    Call this to see how many connections are in use, idle or opened beyond
+    the configured pool size, along with how long checkouts had to wait.
+
+    Args:
+        pool (AsyncAdaptedQueuePool): The pool of an engine, ie engine.pool
+
+    Returns:
+        Dict[str, Any]: Connection counts and checkout wait statistics.
+    """
+    stats = getattr(pool, "checkout_stats", None)
+    return {
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "checkout_wait": stats.snapshot() if stats else None,
+    }
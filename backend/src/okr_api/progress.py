@@ -0,0 +1,109 @@
+"""Objective progress, rolled up incrementally from the progress of its Key Results
+
+An Objective's progress is the weighted average of the progress of its Key
+Results. Instead of rescanning the Key Results on every change, each
+Objective keeps the running sums of its Key Results' weighted progress and
+weights, which writes adjust by the difference they make.
+
+The same writes append the new progress of Key Results to their progress
+history, so that trends can be charted.
+"""
+import typing as t
+from collections import defaultdict
+
+from sqlalchemy import bindparam, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .changes import record_change
+from .models2 import KeyResult, Objective, ProgressHistory
+
+
+def weighted_progress(key_result: KeyResult) -> t.Tuple[int, int]:
+    """Contribution of a Key Result to its Objective's (progress_sum, weight_sum)."""
+    weight = 1 if key_result.weight is None else key_result.weight
+    return (key_result.progress or 0) * weight, weight
+
+
+def rolled_up_progress(progress_sum: t.Any, weight_sum: t.Any) -> t.Any:
+    """SQL expression of Objective progress (rounded weighted average), from running sums."""
+    return case(
+        (weight_sum > 0, (2 * progress_sum + weight_sum) // (2 * weight_sum)),
+        else_=0,
+    )
+
+
+class ProgressRollup:
+    """Accumulates the changes Key Result writes make to their Objectives' progress.
+
+    Call subtract before changing or deleting a Key Result and add after
+    creating or changing it; then apply, in the same transaction. Applying
+    also appends the progress of every Key Result created, or whose progress
+    changed, to the progress history.
+
+    Example:
+        >>> rollup = ProgressRollup()
+        >>> rollup.subtract(key_result)
+        >>> key_result.progress = 80
+        >>> rollup.add(key_result)
+        >>> await rollup.apply(db)
+    """
+
+    def __init__(self):
+        self._deltas: t.Dict[int, t.List[int]] = defaultdict(lambda: [0, 0])
+        # progress of key results before and after the writes, by key result id
+        self._progress_before: t.Dict[int, int] = {}
+        self._progress_after: t.Dict[int, int] = {}
+
+    def add(self, key_result: KeyResult):
+        """Count a (created or changed) Key Result in its Objective's progress."""
+        self._change(key_result, +1)
+        self._progress_after[key_result.id] = key_result.progress or 0
+
+    def subtract(self, key_result: KeyResult):
+        """Stop counting a Key Result in its Objective's progress."""
+        self._change(key_result, -1)
+        self._progress_before.setdefault(key_result.id, key_result.progress or 0)
+
+    def _change(self, key_result: KeyResult, sign: int):
+        progress_sum, weight_sum = weighted_progress(key_result)
+        delta = self._deltas[key_result.objective_id]
+        delta[0] += sign * progress_sum
+        delta[1] += sign * weight_sum
+
+    async def apply(self, db: AsyncSession):
+        """Update the progress of every affected Objective, with a single executemany.
+
+        Also append the new progress of Key Results to their history, with another one.
+        """
+        history = [
+            {"key_result_id": key_result_id, "progress": progress}
+            for key_result_id, progress in self._progress_after.items()
+            if self._progress_before.get(key_result_id) != progress
+        ]
+        self._progress_before.clear()
+        self._progress_after.clear()
+        if history:
+            await db.execute(ProgressHistory.__table__.insert(), history)
+        params = [
+            {"objective": objective_id, "delta_progress": progress, "delta_weight": weight}
+            for objective_id, (progress, weight) in self._deltas.items()
+            if progress or weight
+        ]
+        self._deltas.clear()
+        if not params:
+            return
+        objectives = Objective.__table__
+        progress_sum = objectives.c.progress_sum + bindparam("delta_progress")
+        weight_sum = objectives.c.weight_sum + bindparam("delta_weight")
+        await db.execute(
+            objectives.update()
+            .where(objectives.c.id == bindparam("objective"))
+            .values(
+                progress_sum=progress_sum,
+                weight_sum=weight_sum,
+                progress=rolled_up_progress(progress_sum, weight_sum),
+            ),
+            params,
+        )
+        objective_ids = [p["objective"] for p in params]
+        record_change(db, "objectives", objective_ids, "update", ["progress"])
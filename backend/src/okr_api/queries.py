@@ -0,0 +1,133 @@
+"""Counting of the SQL statements requests run, to catch N+1 query patterns
+
+Tests capture the statements run while they make a request, and assert a
+budget on them (see assert_max_queries). In development, a middleware warns
+when a single request runs the same statement (query shape) more than a
+threshold number of times: typically a lazy load, once per row of a list.
+"""
+import contextlib
+import contextvars
+import logging
+import threading
+import typing as t
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryLog:
+    """The SQL statements run, in order, each with its parameter placeholders."""
+
+    def __init__(self):
+        self.statements: t.List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int) -> t.List[t.Tuple[str, int]]:
+        """Statements run more than threshold times, with their count, most run first."""
+        return [
+            (statement, count)
+            for statement, count in Counter(self.statements).most_common()
+            if count > threshold
+        ]
+
+    def report(self) -> str:
+        """The statements run, numbered, for assertion messages."""
+        return "\n".join(f"{n}. {statement}" for n, statement in enumerate(self.statements, 1))
+
+
+_captures_lock = threading.Lock()
+_captures: t.List[QueryLog] = []
+
+_request_log: contextvars.ContextVar[t.Optional[QueryLog]] = contextvars.ContextVar(
+    "okr_api.request_queries", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _log_statement(conn, cursor, statement, parameters, context, executemany):
+    request_log = _request_log.get()
+    if request_log is not None:
+        request_log.statements.append(statement)
+    if _captures:
+        with _captures_lock:
+            for log in _captures:
+                log.statements.append(statement)
+
+
+@contextlib.contextmanager
+def capture_queries() -> t.Iterator[QueryLog]:
+    """Capture every statement run while in the context, by any thread or task.
+
+    Yields:
+        QueryLog: The statements run so far.
+    """
+    log = QueryLog()
+    with _captures_lock:
+        _captures.append(log)
+    try:
+        yield log
+    finally:
+        with _captures_lock:
+            _captures.remove(log)
+
+
+@contextlib.contextmanager
+def assert_max_queries(budget: int) -> t.Iterator[QueryLog]:
+    """Fail unless the code in the context runs at most budget statements.
+
+    Use it around a single request, in tests, to catch query count regressions:
+
+        with assert_max_queries(2):
+            client.get("/objectives")
+
+    Args:
+        budget (int): Maximum number of statements.
+
+    Yields:
+        QueryLog: The statements run so far.
+    """
+    with capture_queries() as log:
+        yield log
+    assert len(log) <= budget, (
+        f"{len(log)} statements run, over the budget of {budget}:\n{log.report()}"
+    )
+
+
+class QueryRepeatMiddleware:
+    """ASGI middleware warning of HTTP requests running a statement over threshold times.
+
+    Args:
+        app (ASGIApp): The application to watch.
+        threshold (int): Number of runs of the same statement, by a request, that is fine.
+    """
+
+    def __init__(self, app: t.Any, threshold: int = 10):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope: t.Dict[str, t.Any], receive: t.Any, send: t.Any):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        log = QueryLog()
+        token = _request_log.set(log)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_log.reset(token)
+            for statement, count in log.repeated(self.threshold):
+                if not statement.lstrip().upper().startswith("SELECT"):
+                    continue  # ie writes batched on purpose, by imports
+                logger.warning(
+                    "%s %s ran the same statement %d times (likely N+1 queries): %.300s",
+                    scope["method"],
+                    scope["path"],
+                    count,
+                    " ".join(statement.split()),
+                )
@@ -1,14 +1,24 @@
 import uvicorn
 from .create_app import create_app
+from .settings import ServerSettings
 
 
 def run_server():
     """Run the Uvicorn server.
 
-    Call this to start the FastAPI application using Uvicorn.
+    Call this to start the FastAPI application using Uvicorn. With
+    SERVER_PRODUCTION set, it runs a worker process per CPU core (or
+    SERVER_WORKERS), each creating the app, and its database engine, itself.
     """
-    app = create_app()
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    settings = ServerSettings.from_env()
+    if settings.production:
+        # workers import the app factory, rather than inherit an app from this process
+        uvicorn.run(
+            "okr_api.create_app:create_app", factory=True, **settings.uvicorn_options()
+        )
+    else:
+        app = create_app()
+        uvicorn.run(app, **settings.uvicorn_options())
 
 if __name__ == "__main__":
     run_server()
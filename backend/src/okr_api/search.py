@@ -0,0 +1,101 @@
+"""Ranked full-text search over Objectives and Key Results
+
+On Postgres, both tables carry a generated, GIN-indexed tsvector column
+(search_vector); on SQLite, FTS5 tables mirror their text columns. See the
+DDL in okr_api.models2. Either way, a search is a single indexed query, of
+which the hits of both tables come ranked together, best first.
+"""
+import typing as t
+
+from sqlalchemy import (
+    Select, column, desc, func, literal, literal_column, select, table, union_all
+)
+
+from .models2 import KeyResult, Objective
+
+
+def _hits(kind: str, model: t.Any, objective_id: t.Any, title: t.Any, rank: t.Any) -> Select:
+    """Columns of a search hit, common to both tables, so that their hits can be unioned."""
+    return select(
+        literal(kind).label("type"),
+        model.id.label("id"),
+        objective_id.label("objective_id"),
+        title.label("title"),
+        model.description.label("description"),
+        rank.label("rank"),
+    )
+
+
+def _search_both(search: t.Callable[..., Select]) -> t.Any:
+    """Union of the hits of objectives and key results, found by a per-table search."""
+    return union_all(
+        search("objective", Objective, Objective.id, Objective.name),
+        search(
+            "key_result",
+            KeyResult,
+            KeyResult.objective_id,
+            func.coalesce(KeyResult.short_description, KeyResult.description),
+        ),
+    )
+
+
+def postgresql_search(q: str) -> t.Any:
+    """Hits of both tables, ranked by ts_rank; q is in web search syntax (ie "quoted", -not)."""
+    query = func.websearch_to_tsquery("english", q)
+
+    def search(kind: str, model: t.Any, objective_id: t.Any, title: t.Any) -> Select:
+        vector = literal_column(f"{model.__tablename__}.search_vector")
+        return _hits(kind, model, objective_id, title, func.ts_rank(vector, query)).where(
+            vector.op("@@")(query)
+        )
+
+    return _search_both(search)
+
+
+def fts5_query(q: str) -> str:
+    """FTS5 query matching rows containing every word of q, without FTS5 syntax errors."""
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in q.split())
+
+
+def sqlite_search(q: str) -> t.Any:
+    """Hits of both tables, ranked by (negated) bm25, weighing the first column 10 times more."""
+    match = fts5_query(q)
+
+    def search(kind: str, model: t.Any, objective_id: t.Any, title: t.Any) -> Select:
+        fts = table(f"{model.__tablename__}_fts", column("rowid"))
+        fts_name = literal_column(fts.name)
+        return (
+            _hits(kind, model, objective_id, title, -func.bm25(fts_name, 10.0, 1.0))
+            .select_from(fts.join(model.__table__, model.id == fts.c.rowid))
+            .where(fts_name.op("MATCH")(match))
+        )
+
+    return _search_both(search)
+
+
+SEARCHES: t.Dict[str, t.Callable[[str], t.Any]] = {
+    "postgresql": postgresql_search,
+    "sqlite": sqlite_search,
+}
+"""Search query, per database backend (dialect)"""
+
+
+def search_query(dialect: str, q: str, limit: int, offset: int) -> Select:
+    """Query of a page of search hits, best ranked first.
+
+    Args:
+        dialect (str): Name of the database backend, ie 'postgresql'.
+        q (str): The words searched for.
+        limit (int): Maximum number of hits.
+        offset (int): Number of (better ranked) hits to skip.
+
+    Returns:
+        Select: Query of the hits: type, id, objective_id, title, description and rank.
+    """
+    hits = SEARCHES[dialect](q).subquery("hits")
+    return (
+        select(hits)
+        .order_by(desc(hits.c.rank), hits.c.type, hits.c.id)
+        .limit(limit)
+        .offset(offset)
+    )
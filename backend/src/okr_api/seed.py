@@ -0,0 +1,300 @@
+"""Generation of synthetic Objectives, Key Results and progress history, at scale
+
+Run with:
+
+    python -m okr_api.seed --objectives 100000 --key-results 10 --history 5 --reset
+
+The same seed and sizes always generate the same dataset (but for the
+timestamps of the history, which end at the time of the run). Rows are
+generated, and loaded, a chunk of objectives at a time, so memory use does
+not grow with the dataset: with COPY on Postgres, and executemany INSERTs
+on SQLite. Objectives get the progress their key results roll up to.
+
+Generated rows are appended after the existing ones, or replace them with
+--reset, which drops and recreates every table.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import typing as t
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from .models2 import KeyResult, Objective, ProgressHistory, TableVersion, metadata
+
+
+WORDS = (
+    "grow revenue reduce churn launch improve onboarding ship mobile release customer "
+    "satisfaction hire engineers cut costs expand market europe partner program latency "
+    "uptime quality support tickets response time training fitness weekly sessions "
+    "marathon budget savings learn language publish articles community events pipeline "
+    "deals conversion trial accounts retention security audit compliance documentation"
+).split()
+
+METRICS = ("Percent", "Count", "Sessions per week", "Hours", "Euros", None)
+
+SEEDED_TABLES = ("key_results", "objectives")
+"""Tables whose IDs the generator sets, and whose versions (ETags) loading bumps"""
+
+CHUNK_OBJECTIVES = 5000
+"""Objectives generated, and loaded, at a time"""
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Shape of a synthetic dataset.
+
+    Args:
+        objectives (int): Number of objectives.
+        key_results_per_objective (int): Average number of key results of an objective;
+            each has between 1 and twice that, less one.
+        history_depth (int): Progress changes recorded per key result, the last being
+            its current progress.
+        history_days (int): Days back the progress history spans.
+        name_words (int): Words in the name of an objective.
+        description_words (int): Words in the description of an objective or key result.
+        seed (int): Seed of the random generator.
+    """
+    objectives: int = 1000
+    key_results_per_objective: int = 10
+    history_depth: int = 0
+    history_days: int = 90
+    name_words: int = 4
+    description_words: int = 20
+    seed: int = 42
+
+
+Rows = t.List[t.Dict[str, t.Any]]
+
+
+def generate(
+    spec: DatasetSpec, first_objective_id: int = 1, first_key_result_id: int = 1
+) -> t.Iterator[t.Tuple[Rows, Rows, Rows]]:
+    """Generate the rows of a dataset, a chunk of objectives at a time.
+
+    Args:
+        spec (DatasetSpec): Shape of the dataset.
+        first_objective_id (int): ID of the first objective; the others follow.
+        first_key_result_id (int): ID of the first key result; the others follow.
+
+    Yields:
+        Tuple[Rows, Rows, Rows]: Rows of objectives, key results and progress history.
+    """
+    rng = random.Random(spec.seed)
+    now = datetime.now(timezone.utc)
+    history_seconds = spec.history_days * 24 * 3600
+
+    def words(count: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(count))
+
+    def progress_history(key_result_id: int, progress: int) -> Rows:
+        # a rising progress, ending at the current one, at random times
+        steps = sorted(rng.randint(0, progress) for _ in range(spec.history_depth - 1))
+        moments = sorted(rng.randint(0, history_seconds) for _ in range(spec.history_depth))
+        return [
+            {
+                "key_result_id": key_result_id,
+                "progress": step,
+                "recorded_at": now - timedelta(seconds=history_seconds - seconds),
+            }
+            for step, seconds in zip(steps + [progress], moments)
+        ]
+
+    key_result_id = first_key_result_id
+    for chunk_start in range(0, spec.objectives, CHUNK_OBJECTIVES):
+        objectives, key_results, history = [], [], []
+        for objective_id in range(
+            first_objective_id + chunk_start,
+            first_objective_id + min(chunk_start + CHUNK_OBJECTIVES, spec.objectives),
+        ):
+            progress_sum = weight_sum = 0
+            count = rng.randint(1, max(1, 2 * spec.key_results_per_objective - 1))
+            for _ in range(count):
+                progress, weight = rng.randint(0, 100), rng.randint(1, 3)
+                progress_sum += progress * weight
+                weight_sum += weight
+                key_results.append(
+                    {
+                        "id": key_result_id,
+                        "objective_id": objective_id,
+                        "description": words(spec.description_words).capitalize(),
+                        "short_description": (
+                            words(3).capitalize() if rng.random() < 0.5 else None
+                        ),
+                        "progress": progress,
+                        "metric": rng.choice(METRICS),
+                        "unit": 1,
+                        "weight": weight,
+                    }
+                )
+                if spec.history_depth:
+                    history += progress_history(key_result_id, progress)
+                key_result_id += 1
+            objectives.append(
+                {
+                    "id": objective_id,
+                    "name": words(spec.name_words).capitalize(),
+                    "description": words(spec.description_words).capitalize(),
+                    # what okr_api.progress rolls up
+                    "progress": (2 * progress_sum + weight_sum) // (2 * weight_sum),
+                    "progress_sum": progress_sum,
+                    "weight_sum": weight_sum,
+                }
+            )
+        yield objectives, key_results, history
+
+
+async def copy_rows(conn: AsyncConnection, table: Table, rows: Rows):
+    """Load rows into a Postgres table, with COPY."""
+    columns = list(rows[0])
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        table.name, records=[tuple(row[c] for c in columns) for row in rows], columns=columns
+    )
+
+
+async def insert_rows(conn: AsyncConnection, table: Table, rows: Rows):
+    """Load rows into a table, with a (multi-row) executemany INSERT."""
+    await conn.execute(table.insert(), rows)
+
+
+LOADERS: t.Dict[str, t.Callable[[AsyncConnection, Table, Rows], t.Awaitable[None]]] = {
+    "postgresql": copy_rows,
+    "sqlite": insert_rows,
+}
+"""Fastest way to load rows, per database backend (dialect)"""
+
+
+async def load(
+    engine: AsyncEngine,
+    spec: DatasetSpec,
+    reset: bool = False,
+    report: t.Callable[[int], None] = lambda objectives: None,
+) -> t.Tuple[range, range]:
+    """Generate a dataset and load it, in a single transaction.
+
+    Args:
+        engine (AsyncEngine): Engine of the database to load into.
+        spec (DatasetSpec): Shape of the dataset.
+        reset (bool): Drop and recreate every table first, rather than append.
+        report (Callable[[int], None]): Called with the number of objectives loaded so far.
+
+    Returns:
+        Tuple[range, range]: IDs of the objectives and key results loaded.
+    """
+    from .versions import UPSERTS
+
+    dialect = engine.dialect.name
+    load_rows = LOADERS[dialect]
+    async with engine.begin() as conn:
+        if reset:
+            await conn.run_sync(metadata.drop_all)
+            await conn.run_sync(metadata.create_all)
+        first_objective_id = 1 + await conn.scalar(
+            select(func.coalesce(func.max(Objective.id), 0))
+        )
+        first_key_result_id = 1 + await conn.scalar(
+            select(func.coalesce(func.max(KeyResult.id), 0))
+        )
+        loaded = key_results_loaded = 0
+        for objectives, key_results, history in generate(
+            spec, first_objective_id, first_key_result_id
+        ):
+            await load_rows(conn, Objective.__table__, objectives)
+            await load_rows(conn, KeyResult.__table__, key_results)
+            if history:
+                await load_rows(conn, ProgressHistory.__table__, history)
+            loaded += len(objectives)
+            key_results_loaded += len(key_results)
+            report(loaded)
+        if dialect == "postgresql":
+            # IDs were set explicitly, so move the sequences past them
+            for table in SEEDED_TABLES:
+                await conn.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+                    )
+                )
+        # new ETags, for clients that hold data read before the load
+        await conn.execute(
+            UPSERTS[dialect](TableVersion)
+            .values([{"table_name": table, "version": 1} for table in SEEDED_TABLES])
+            .on_conflict_do_update(
+                index_elements=[TableVersion.table_name],
+                set_={"version": TableVersion.version + 1},
+            )
+        )
+    if dialect == "postgresql":
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.execute(text("ANALYZE objectives, key_results, progress_history"))
+    return (
+        range(first_objective_id, first_objective_id + loaded),
+        range(first_key_result_id, first_key_result_id + key_results_loaded),
+    )
+
+
+def main(argv: t.Optional[t.Sequence[str]] = None) -> int:
+    defaults = DatasetSpec()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objectives", type=int, default=defaults.objectives)
+    parser.add_argument(
+        "--key-results",
+        type=int,
+        default=defaults.key_results_per_objective,
+        help="Average number of key results per objective",
+    )
+    parser.add_argument(
+        "--history",
+        type=int,
+        default=defaults.history_depth,
+        help="Progress changes recorded per key result",
+    )
+    parser.add_argument("--history-days", type=int, default=defaults.history_days)
+    parser.add_argument("--name-words", type=int, default=defaults.name_words)
+    parser.add_argument("--description-words", type=int, default=defaults.description_words)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--reset", action="store_true", help="Drop and recreate every table first"
+    )
+    args = parser.parse_args(argv)
+    spec = DatasetSpec(
+        objectives=args.objectives,
+        key_results_per_objective=args.key_results,
+        history_depth=args.history,
+        history_days=args.history_days,
+        name_words=args.name_words,
+        description_words=args.description_words,
+        seed=args.seed,
+    )
+
+    from .db import dispose_async_engine, get_async_engine
+
+    async def run() -> t.Tuple[range, range]:
+        try:
+            return await load(
+                get_async_engine(),
+                spec,
+                reset=args.reset,
+                report=lambda n: print(f"{n}/{spec.objectives} objectives", end="\r"),
+            )
+        finally:
+            await dispose_async_engine()
+
+    start = time.perf_counter()
+    objective_ids, key_result_ids = asyncio.run(run())
+    print(
+        f"Loaded {len(objective_ids)} objectives and {len(key_result_ids)} key results "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
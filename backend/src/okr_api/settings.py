@@ -0,0 +1,159 @@
+"""Runtime settings, read from environment variables"""
+import os
+import typing as t
+from dataclasses import asdict, dataclass
+
+
+def env_bool(value: str) -> bool:
+    """Interpret an environment variable value as a boolean flag."""
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def fields_from_env(
+    env_vars: t.Mapping[str, str],
+    casts: t.Mapping[str, t.Callable[[str], t.Any]],
+    environ: t.Mapping[str, str],
+) -> t.Dict[str, t.Any]:
+    """Values of the settings fields whose environment variable is set (int unless cast)."""
+    return {
+        field: casts.get(field, int)(environ[var])
+        for field, var in env_vars.items()
+        if var in environ
+    }
+
+
+@dataclass(frozen=True)
+class DatabaseSettings:
+    """Encapsulates the Engine and Connection Pool settings.
+
+    Args:
+        pool_size (int): Number of connections kept open in the pool.
+        max_overflow (int): Connections allowed to open beyond pool_size, under load.
+        pool_timeout (float): Seconds to wait for a connection, before giving up.
+        pool_recycle (int): Seconds after which a connection is replaced; -1 to never recycle.
+        pool_pre_ping (bool): Test connections for liveness on checkout.
+        echo (bool): Log every SQL statement emitted.
+    """
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    echo: bool = False
+
+    ENV_VARS: t.ClassVar[t.Dict[str, str]] = {
+        "pool_size": "DB_POOL_SIZE",
+        "max_overflow": "DB_MAX_OVERFLOW",
+        "pool_timeout": "DB_POOL_TIMEOUT",
+        "pool_recycle": "DB_POOL_RECYCLE",
+        "pool_pre_ping": "DB_POOL_PRE_PING",
+        "echo": "DB_ECHO",
+    }
+
+    @classmethod
+    def from_env(cls, environ: t.Mapping[str, str] = os.environ) -> "DatabaseSettings":
+        """Create settings from environment variables, falling back to defaults.
+
+        Args:
+            environ (Mapping[str, str]): Environment variables to read from.
+
+        Returns:
+            DatabaseSettings: The settings found in the environment.
+        """
+        casts = {"pool_pre_ping": env_bool, "echo": env_bool, "pool_timeout": float}
+        return cls(**fields_from_env(cls.ENV_VARS, casts, environ))
+
+    def engine_options(self) -> t.Dict[str, t.Any]:
+        """Keyword arguments to pass to (async) engine creation."""
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """Encapsulates the settings of the in-process cache of objectives and key results.
+
+    Args:
+        max_size (int): Entries kept, before evicting the least recently used; 0 disables.
+        ttl (float): Seconds an entry is served for, before it is read from the database again.
+    """
+    max_size: int = 1024
+    ttl: float = 60.0
+
+    ENV_VARS: t.ClassVar[t.Dict[str, str]] = {
+        "max_size": "CACHE_MAX_SIZE",
+        "ttl": "CACHE_TTL",
+    }
+
+    @classmethod
+    def from_env(cls, environ: t.Mapping[str, str] = os.environ) -> "CacheSettings":
+        """Create settings from environment variables, falling back to defaults.
+
+        Args:
+            environ (Mapping[str, str]): Environment variables to read from.
+
+        Returns:
+            CacheSettings: The settings found in the environment.
+        """
+        return cls(**fields_from_env(cls.ENV_VARS, {"ttl": float}, environ))
+
+
+@dataclass(frozen=True)
+class ServerSettings:
+    """Encapsulates the settings of the Uvicorn server.
+
+    In production, every worker process serves with its own connection pool,
+    so the database must accept workers * (pool_size + max_overflow) connections.
+
+    Args:
+        production (bool): Serve with several worker processes, on uvloop and httptools.
+        host (str): Interface to bind to.
+        port (int): Port to bind to.
+        workers (int): Worker processes, in production; 0 for one per CPU core.
+        timeout_keep_alive (int): Seconds an idle keep-alive connection is kept open.
+        backlog (int): Connections waiting to be accepted, before new ones are refused.
+        query_repeat_threshold (int): Runs of the same query by a request, beyond which a
+            warning of N+1 queries is logged, in development (not production); 0 disables.
+    """
+    production: bool = False
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 0
+    timeout_keep_alive: int = 5
+    backlog: int = 2048
+    query_repeat_threshold: int = 10
+
+    ENV_VARS: t.ClassVar[t.Dict[str, str]] = {
+        "production": "SERVER_PRODUCTION",
+        "host": "SERVER_HOST",
+        "port": "SERVER_PORT",
+        "workers": "SERVER_WORKERS",
+        "timeout_keep_alive": "SERVER_KEEP_ALIVE",
+        "backlog": "SERVER_BACKLOG",
+        "query_repeat_threshold": "QUERY_REPEAT_THRESHOLD",
+    }
+
+    @classmethod
+    def from_env(cls, environ: t.Mapping[str, str] = os.environ) -> "ServerSettings":
+        """Create settings from environment variables, falling back to defaults.
+
+        Args:
+            environ (Mapping[str, str]): Environment variables to read from.
+
+        Returns:
+            ServerSettings: The settings found in the environment.
+        """
+        casts = {"production": env_bool, "host": str}
+        return cls(**fields_from_env(cls.ENV_VARS, casts, environ))
+
+    def uvicorn_options(self) -> t.Dict[str, t.Any]:
+        """Keyword arguments to pass to uvicorn.run, besides the app."""
+        options = {"host": self.host, "port": self.port}
+        if self.production:
+            options.update(
+                workers=self.workers or os.cpu_count() or 1,
+                loop="uvloop",
+                http="httptools",
+                timeout_keep_alive=self.timeout_keep_alive,
+                backlog=self.backlog,
+            )
+        return options
@@ -0,0 +1,105 @@
+"""Per-table version counters, bumped by writes, from which GET responses derive their ETags
+
+Every transaction that records changes (see okr_api.changes) to a table
+increments the table's counter when it commits. A read then compares the
+counters of the tables it depends on with the client's If-None-Match, and
+answers 304 Not Modified, without querying or serializing any data, if the
+client already holds the current representation.
+"""
+import typing as t
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .cache import request_versions
+from .changes import pending_changes
+from .db import get_async_db_session
+from .models2 import TableVersion
+
+
+UPSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+"""INSERT .. ON CONFLICT construct, per database backend (dialect)"""
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session: Session):
+    tables = sorted({change.table for change in pending_changes(session)})
+    if not tables:
+        return
+    # upsert, so that a missing counter row can never freeze an ETag
+    insert = UPSERTS[session.get_bind().dialect.name](TableVersion)
+    session.execute(
+        insert.values([{"table_name": table, "version": 1} for table in tables])
+        .on_conflict_do_update(
+            index_elements=[TableVersion.table_name],
+            set_={"version": TableVersion.version + 1},
+        )
+    )
+
+
+async def read_versions(db: AsyncSession, tables: t.Iterable[str]) -> t.Dict[str, int]:
+    """Current version of each table; 0 for tables never written to."""
+    tables = sorted(set(tables))
+    versions = dict.fromkeys(tables, 0)
+    rows = await db.execute(
+        select(TableVersion.table_name, TableVersion.version).where(
+            TableVersion.table_name.in_(tables)
+        )
+    )
+    versions.update(rows.tuples().all())
+    return versions
+
+
+def make_etag(versions: t.Dict[str, int]) -> str:
+    """Strong ETag, ie "key_results.4.objectives.7", of data depending on tables' versions."""
+    return '"{}"'.format(".".join(f"{table}.{version}" for table, version in versions.items()))
+
+
+def matches(etag: str, if_none_match: t.Optional[str]) -> bool:
+    """Tell whether an If-None-Match header value matches an ETag."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    # weak comparison, as required for If-None-Match; "*" is not matched, since it
+    # depends on the entity existing, which is only known once the endpoint has run
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+class ETag:
+    """Dependency of GET endpoints, that sets the ETag header and answers 304 if not modified.
+
+    Args:
+        tables (str): Tables the response data is read from.
+        include (Dict[str, str]): Extra table read, per value of the 'include' query param.
+
+    Example:
+        >>> @router.get("/objectives/", dependencies=[Depends(ETag("objectives"))])
+    """
+
+    def __init__(self, *tables: str, include: t.Optional[t.Dict[str, str]] = None):
+        self.tables = tables
+        self.include = include or {}
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_async_db_session),
+    ):
+        tables = list(self.tables)
+        included = request.query_params.get("include")
+        if included in self.include:
+            tables.append(self.include[included])
+        versions = await read_versions(db, tables)
+        etag = make_etag(versions)
+        if matches(etag, request.headers.get("if-none-match")):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        # so that cached data is only served under the ETag of the versions it was read at
+        request_versions.set(tuple(versions.items()))
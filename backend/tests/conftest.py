@@ -0,0 +1,54 @@
+import os
+import tempfile
+
+import pytest
+
+
+# Endpoint tests run against a throw-away database, never the one in DATABASE_URL
+TEST_DATABASE_URL = os.getenv(
+    "OKR_API_TEST_DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'okr_api_test.db')}",
+)
+os.environ["ASYNC_DATABASE_URL"] = TEST_DATABASE_URL
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Provide an HTTP client, driving the ASGI app in-process."""
+    from fastapi.testclient import TestClient
+    from okr_api.create_app import create_app
+
+    with TestClient(create_app()) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def clean_db(client):
+    """Recreate an empty schema, and empty the cache, before a test runs."""
+    from okr_api.cache import cache
+    from okr_api.db import get_async_engine
+    from okr_api.models2 import metadata
+
+    async def recreate_schema():
+        async with get_async_engine().begin() as conn:
+            await conn.run_sync(metadata.drop_all)
+            await conn.run_sync(metadata.create_all)
+
+    client.portal.call(recreate_schema)
+    cache.clear()
+    yield
+
+
+@pytest.fixture
+def objective(client, clean_db):
+    """Create an Objective with 2 Key Results and return its ID."""
+    response = client.post(
+        "/objectives", json={"name": "Training", "description": "Get fit in 12 weeks"}
+    )
+    objective_id = response.json()["id"]
+    for description, progress in (("Attend sessions", 50), ("Run 5km", 30)):
+        client.post(
+            "/key_results",
+            json={"objective_id": objective_id, "description": description, "progress": progress},
+        )
+    return objective_id
@@ -0,0 +1,49 @@
+import asyncio
+
+from okr_api.benchmark import SCENARIOS, compare, percentile, run_benchmarks, summarize
+
+
+def test_percentiles():
+    """Report nearest-rank percentiles, in milliseconds, and throughput."""
+    latencies = [n / 1000 for n in range(100, 0, -1)]  # 1..100 ms
+
+    result = summarize("GET /objectives/", 10, 2, latencies, 1, seconds=2.0)
+
+    assert percentile([1.0], 99) == 1.0
+    assert (result.p50_ms, result.p95_ms, result.p99_ms) == (50.0, 95.0, 99.0)
+    assert (result.requests, result.errors, result.throughput) == (100, 1, 50.0)
+
+
+def test_compare_flags_regressions():
+    """Flag lower throughput and higher p95 beyond the tolerance, for matching measures."""
+    baseline = [
+        summarize("GET /objectives/", 10, 1, [0.010] * 10, 0, seconds=0.1),
+        summarize("POST /objectives", 10, 1, [0.010] * 10, 0, seconds=0.1),
+    ]
+    results = [
+        summarize("GET /objectives/", 10, 1, [0.011] * 10, 0, seconds=0.11),
+        summarize("POST /objectives", 10, 1, [0.020] * 10, 0, seconds=0.2),
+        summarize("POST /objectives", 10, 8, [0.020] * 10, 0, seconds=0.2),
+    ]
+
+    assert compare(results, baseline, tolerance=0.2) == [
+        "POST /objectives (size 10, concurrency 1): throughput 100.0 -> 50.0 req/s",
+        "POST /objectives (size 10, concurrency 1): p95 10.0 -> 20.0 ms",
+    ]
+
+
+def test_run_benchmarks(client):
+    """Run every scenario against a seeded database, without errors."""
+    results = asyncio.run(run_benchmarks([3], [2], requests=4))
+
+    assert [result.scenario for result in results] == list(SCENARIOS)
+    assert all(result.requests == 4 and result.errors == 0 for result in results)
+
+
+def test_run_delete_scenario_alone(client):
+    """Create the key results the delete scenario deletes, when no scenario did before it."""
+    results = asyncio.run(
+        run_benchmarks([3], [2], requests=4, scenarios=["DELETE /key_results/{id}"])
+    )
+
+    assert [(result.requests, result.errors) for result in results] == [(4, 0)]
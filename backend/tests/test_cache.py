@@ -0,0 +1,129 @@
+import pytest
+
+from okr_api.cache import MISSING, Cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_evicts_least_recently_used(clock):
+    """Keep the most recently read entries, once full."""
+    cache = Cache(max_size=2, ttl=10, clock=clock)
+    cache.set("a", 1, [], cache.generation)
+    cache.set("b", 2, [], cache.generation)
+    cache.get("a")
+    cache.set("c", 3, [], cache.generation)
+
+    assert cache.get("b") is MISSING
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire(clock):
+    """Stop serving an entry once its TTL has passed."""
+    cache = Cache(max_size=2, ttl=10, clock=clock)
+    cache.set("a", 1, [], cache.generation)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is MISSING
+
+
+def test_invalidate_by_tag(clock):
+    """Remove only the entries carrying the tag."""
+    cache = Cache(max_size=10, ttl=10, clock=clock)
+    cache.set("objective 1", 1, [("objectives", 1)], cache.generation)
+    cache.set("objective 2", 2, [("objectives", 2)], cache.generation)
+    cache.set("objectives", [1, 2], [("objectives",)], cache.generation)
+
+    cache.invalidate([("objectives", 1), ("objectives",)])
+
+    assert cache.get("objective 1") is MISSING
+    assert cache.get("objectives") is MISSING
+    assert cache.get("objective 2") == 2
+
+
+def test_value_read_before_invalidation_is_not_stored(clock):
+    """Never store data that a concurrent write has made stale, while it was being read."""
+    cache = Cache(max_size=10, ttl=10, clock=clock)
+    generation = cache.generation
+    cache.invalidate([("objectives", 1)])
+    cache.set("objective 1", 1, [("objectives", 1)], generation)
+    assert cache.get("objective 1") is MISSING
+
+
+def test_detail_reads_are_served_from_cache(client, objective):
+    """Hit the cache on repeated reads, and miss it after a write to the entity."""
+    def counts():
+        stats = client.get("/diagnostics/cache").json()
+        return stats["hits"], stats["misses"]
+
+    hits, misses = counts()  # of earlier tests
+    client.get(f"/objectives/{objective}")
+    client.get(f"/objectives/{objective}")
+    assert counts() == (hits + 1, misses + 1)
+
+    client.put(f"/objectives/{objective}", json={"name": "Marathon"})
+
+    assert client.get(f"/objectives/{objective}").json()["name"] == "Marathon"
+    assert counts() == (hits + 1, misses + 2)
+
+
+def test_key_result_write_invalidates_objective(client, objective):
+    """Serve the new progress of an objective, after a key result write rolls it up."""
+    key_result = client.get("/key_results/").json()[0]
+    assert client.get(f"/objectives/{objective}").json()["progress"] == 40
+
+    client.put(f"/key_results/{key_result['id']}", json={"progress": 90})
+
+    assert client.get(f"/key_results/{key_result['id']}").json()["progress"] == 90
+    assert client.get("/key_results/").json()[0]["progress"] == 90
+    assert client.get(f"/objectives/{objective}").json()["progress"] == 60
+
+
+def test_cached_page_keeps_next_cursor(client, objective):
+    """Serve the next page cursor along with a cached page."""
+    first = client.get("/key_results/", params={"limit": 1})
+    cached = client.get("/key_results/", params={"limit": 1})
+    assert cached.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+
+def test_entry_of_older_versions_is_not_served(client, objective, monkeypatch):
+    """Miss the cache once the versions of the ETag moved on, even before invalidation."""
+    from okr_api import changes
+
+    before = client.get(f"/objectives/{objective}")
+    # a write whose invalidation has not run here yet, ie committed by another worker
+    monkeypatch.setattr(changes, "_subscribers", [])
+    client.put(f"/objectives/{objective}", json={"name": "Marathon"})
+
+    after = client.get(f"/objectives/{objective}")
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert after.json()["name"] == "Marathon"
+
+
+def test_key_results_endpoints_keep_their_own_entries(client, objective):
+    """Hit the cache on both key results lists of an objective, read alternately."""
+    def counts():
+        stats = client.get("/diagnostics/cache").json()
+        return stats["hits"], stats["misses"]
+
+    paths = [f"/objectives/{objective}/key_results", f"/key_results/?objective_id={objective}"]
+    for path in paths:
+        client.get(path)
+    hits, misses = counts()
+
+    for path in paths:
+        assert client.get(path).json()[0]["description"] == "Attend sessions"
+
+    assert counts() == (hits + 2, misses)
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+from okr_api.change_feed import ChangeFeed, feed
+from okr_api.changes import Change
+from okr_api.endpoints.events import change_events
+
+
+PROGRESS = Change("key_results", 1, "update", ("progress",))
+
+
+def test_change_events_stream():
+    """Stream each change as a server-sent event, with an ID to resume after."""
+    async def scenario():
+        change_feed = ChangeFeed()
+        events = change_events(change_feed)
+        assert await anext(events) == "retry: 3000\n\n"
+        change_feed.publish([PROGRESS, Change("objectives", 2, "delete")])
+        return [await anext(events), await anext(events)], change_feed.id
+
+    (first, second), feed_id = asyncio.run(scenario())
+
+    assert first == (
+        f"id: {feed_id}.1\nevent: change\n"
+        'data: {"entity": "key_result", "id": 1, "op": "update", "fields": ["progress"]}\n\n'
+    )
+    assert second.splitlines()[2] == 'data: {"entity": "objective", "id": 2, "op": "delete"}'
+
+
+def test_resume_after_last_event_id():
+    """Replay the events a reconnecting subscriber missed, or tell it to reset."""
+    async def scenario():
+        change_feed = ChangeFeed(history_size=1)
+        change_feed.publish([PROGRESS] * 3)
+        async with change_feed.subscribe(f"{change_feed.id}.1") as behind:
+            pass
+        async with change_feed.subscribe(f"{change_feed.id}.2") as recent:
+            replayed = (await recent.get(1)).number
+        async with change_feed.subscribe("restarted.2") as restarted:
+            pass
+        return behind.reset, replayed, recent.reset, restarted.reset
+
+    assert asyncio.run(scenario()) == (True, 3, False, True)
+
+
+def test_slow_subscriber_is_reset():
+    """Stop queueing for a subscriber that fell too far behind, and end its stream."""
+    async def scenario():
+        change_feed = ChangeFeed(queue_size=1)
+        events = change_events(change_feed)
+        await anext(events)
+        change_feed.publish([PROGRESS] * 2)
+        await asyncio.sleep(0)  # let the events be queued
+        return [event async for event in events]
+
+    assert asyncio.run(scenario()) == ["event: reset\ndata: {}\n\n"]
+
+
+def test_committed_writes_are_published(client, objective):
+    """Publish the key result update, and the objective progress it rolled up to."""
+    key_result = client.get("/key_results/").json()[0]["id"]
+    subscribed = threading.Event()
+
+    async def next_events(count):
+        async with feed.subscribe() as subscription:
+            subscribed.set()
+            return [(await subscription.get(timeout=5)).data() for _ in range(count)]
+
+    events = client.portal.start_task_soon(next_events, 2)
+    subscribed.wait(5)
+    client.put(f"/key_results/{key_result}", json={"progress": 90})
+
+    assert events.result(5) == [
+        {"entity": "key_result", "id": key_result, "op": "update", "fields": ["progress"]},
+        {"entity": "objective", "id": objective, "op": "update", "fields": ["progress"]},
+    ]
@@ -0,0 +1,54 @@
+def test_dashboard_summary(client, objective):
+    """Aggregate the key results of every objective, including those without any."""
+    client.post("/key_results", json={"objective_id": objective, "description": "Swim", "progress": 100})
+    empty = client.post("/objectives", json={"name": "Empty", "description": "-"}).json()["id"]
+
+    summary = client.get("/dashboard/summary").json()
+
+    assert summary == [
+        {
+            "id": objective,
+            "name": "Training",
+            "description": "Get fit in 12 weeks",
+            "progress": 60,
+            "key_results": 3,
+            "completed_key_results": 1,
+            "avg_progress": 60.0,
+            "min_progress": 30,
+            "max_progress": 100,
+        },
+        {
+            "id": empty,
+            "name": "Empty",
+            "description": "-",
+            "progress": 0,
+            "key_results": 0,
+            "completed_key_results": 0,
+            "avg_progress": None,
+            "min_progress": None,
+            "max_progress": None,
+        },
+    ]
+
+
+def test_dashboard_top_objectives(client, objective):
+    """Serve only the top objectives, by the requested sort key."""
+    client.post("/objectives", json={"name": "Empty", "description": "-"})
+    client.post("/objectives", json={"name": "Other", "description": "-"})
+
+    top = client.get(
+        "/dashboard/summary", params={"sort": "key_results", "order": "desc", "limit": 2}
+    ).json()
+
+    assert [objective["name"] for objective in top] == ["Training", "Other"]
+
+
+def test_dashboard_summary_follows_writes(client, objective):
+    """Serve fresh aggregates after a key result changes."""
+    key_result = client.get("/key_results/").json()[0]
+    assert client.get("/dashboard/summary").json()[0]["max_progress"] == 50
+
+    client.put(f"/key_results/{key_result['id']}", json={"progress": 100})
+
+    summary = client.get("/dashboard/summary").json()[0]
+    assert (summary["max_progress"], summary["completed_key_results"]) == (100, 1)
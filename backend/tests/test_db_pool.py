@@ -0,0 +1,50 @@
+from okr_api.settings import DatabaseSettings, ServerSettings
+
+
+def test_database_settings_from_env():
+    """Read pool settings from the environment, keeping defaults for the rest."""
+    settings = DatabaseSettings.from_env(
+        {"DB_POOL_SIZE": "20", "DB_POOL_TIMEOUT": "2.5", "DB_POOL_PRE_PING": "false"}
+    )
+    assert settings.pool_size == 20
+    assert settings.pool_timeout == 2.5
+    assert settings.pool_pre_ping is False
+    assert settings.max_overflow == DatabaseSettings.max_overflow
+    assert settings.echo is False
+
+
+def test_db_pool_status(client, objective):
+    """Report connection counts and checkout waits of the serving pool."""
+    status = client.get("/diagnostics/db_pool").json()
+    assert status["pool_size"] == DatabaseSettings.pool_size
+    assert status["checked_out"] == 0
+    assert status["idle"] >= 1
+    assert status["checkout_wait"]["count"] >= 3
+    assert status["checkout_wait"]["timeouts"] == 0
+
+
+def test_server_settings_production_options():
+    """Serve with workers on uvloop and httptools in production, plainly otherwise."""
+    assert ServerSettings.from_env({}).uvicorn_options() == {"host": "0.0.0.0", "port": 8000}
+
+    options = ServerSettings.from_env(
+        {"SERVER_PRODUCTION": "true", "SERVER_WORKERS": "4", "SERVER_BACKLOG": "512"}
+    ).uvicorn_options()
+    assert options["workers"] == 4
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert options["backlog"] == 512
+    assert options["timeout_keep_alive"] == ServerSettings.timeout_keep_alive
+
+
+def test_engine_per_process_lifespan():
+    """Create and warm up the engine when the app starts, and dispose of it on shutdown."""
+    from fastapi.testclient import TestClient
+    from okr_api import db
+    from okr_api.create_app import create_app
+
+    with TestClient(create_app()):
+        engine = db._async_engine
+        assert engine is not None
+        assert engine.pool.checkedin() == DatabaseSettings.pool_size
+    assert db._async_engine is None
@@ -0,0 +1,121 @@
+def test_objective_crud(client, clean_db):
+    """Create, read, update and delete an Objective."""
+    created = client.post("/objectives", json={"name": "Read", "description": "Read 12 books"})
+    assert created.status_code == 200
+    objective_id = created.json()["id"]
+
+    assert client.get(f"/objectives/{objective_id}").json()["name"] == "Read"
+
+    updated = client.put(f"/objectives/{objective_id}", json={"name": "Read more"})
+    assert updated.json()["name"] == "Read more"
+    assert updated.json()["description"] == "Read 12 books"
+
+    assert client.delete(f"/objectives/{objective_id}").status_code == 200
+    assert client.get(f"/objectives/{objective_id}").status_code == 404
+
+
+def test_key_result_crud(client, objective):
+    """Create, read, update and delete a Key Result."""
+    created = client.post(
+        "/key_results",
+        json={"objective_id": objective, "description": "Swim 1km", "unit": 3},
+    )
+    assert created.status_code == 200
+    key_result_id = created.json()["id"]
+
+    updated = client.put(f"/key_results/{key_result_id}", json={"progress": 75})
+    assert updated.json()["progress"] == 75
+    assert updated.json()["unit"] == 3
+
+    key_results = client.get("/key_results/").json()
+    assert [kr["description"] for kr in key_results] == ["Attend sessions", "Run 5km", "Swim 1km"]
+
+    assert client.delete(f"/key_results/{key_result_id}").status_code == 200
+    assert client.get(f"/key_results/{key_result_id}").status_code == 404
+
+
+def test_missing_entities_return_404(client, clean_db):
+    """Report missing Objectives and Key Results as Not Found."""
+    assert client.get("/objectives/999").status_code == 404
+    assert client.put("/objectives/999", json={"name": "x"}).status_code == 404
+    assert client.delete("/key_results/999").status_code == 404
+    assert client.get("/objectives/999/progress").status_code == 404
+    orphan = {"objective_id": 999, "description": "Orphan"}
+    assert client.post("/key_results", json=orphan).status_code == 404
+
+
+def test_deleting_objective_deletes_its_key_results(client, objective):
+    """Cascade the deletion of an Objective to its Key Results."""
+    assert client.delete(f"/objectives/{objective}").status_code == 200
+
+    assert client.get("/key_results/").json() == []
+
+
+def test_create_objective_with_key_results(client, clean_db):
+    """Create an Objective and its Key Results with a single request."""
+    created = client.post("/objectives", json={
+        "name": "Run",
+        "description": "Run a marathon",
+        "key_results": [
+            {"short_description": "10k", "description": "Run 10km", "progress": 20},
+            {"description": "Run 3 times a week", "metric": "sessions", "unit": 3},
+        ],
+    })
+    assert created.status_code == 200
+    objective = created.json()
+    assert [kr["objective_id"] for kr in objective["key_results"]] == [objective["id"]] * 2
+    assert objective["key_results"][0]["progress"] == 20
+    assert objective["key_results"][1]["unit"] == 3
+    assert client.get(f"/objectives/{objective['id']}/key_results").json() == objective["key_results"]
+
+
+def test_create_objective_with_invalid_key_result(client, clean_db):
+    """Create nothing when any nested Key Result is invalid."""
+    response = client.post("/objectives", json={
+        "name": "Run",
+        "description": "Run a marathon",
+        "key_results": [{"description": "Run 10km"}, {"progress": 20}],
+    })
+    assert response.status_code == 422
+    assert client.get("/objectives/").json() == []
+
+
+def test_batch_update_key_results(client, objective):
+    """Apply a batch of partial updates to many Key Results at once."""
+    first, second = client.get(f"/objectives/{objective}/key_results").json()
+
+    response = client.patch("/key_results", json=[
+        {"id": second["id"], "progress": 90},
+        {"id": first["id"], "progress": 60, "metric": "sessions"},
+    ])
+
+    assert response.status_code == 200
+    updated = response.json()
+    assert [kr["id"] for kr in updated] == [first["id"], second["id"]]
+    assert [kr["progress"] for kr in updated] == [60, 90]
+    assert updated[0]["metric"] == "sessions"
+    assert updated[1]["description"] == second["description"]
+    assert client.get("/key_results/").json() == updated
+
+
+def test_batch_update_is_all_or_nothing(client, objective):
+    """Update nothing when any Key Result of the batch does not exist."""
+    before = client.get("/key_results/").json()
+
+    response = client.patch("/key_results", json=[
+        {"id": before[0]["id"], "progress": 99},
+        {"id": 999, "progress": 10},
+    ])
+
+    assert response.status_code == 404
+    assert "999" in response.json()["detail"]
+    assert client.get("/key_results/").json() == before
+    duplicate = [{"id": before[0]["id"], "progress": 1}, {"id": before[0]["id"], "progress": 2}]
+    assert client.patch("/key_results", json=duplicate).status_code == 400
+
+
+def test_response_models_are_documented(client):
+    """Describe the shape of responses in the OpenAPI schema."""
+    schemas = client.get("/openapi.json").json()["components"]["schemas"]
+    assert {"KeyResultRead", "ObjectiveRead", "ObjectiveWithKeyResults"} <= set(schemas)
+    assert "weight" in schemas["KeyResultRead"]["required"]
@@ -0,0 +1,85 @@
+import pytest
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/objectives/",
+        "/objectives/{objective}",
+        "/objectives/{objective}/progress",
+        "/objectives/{objective}/key_results",
+        "/key_results/",
+    ],
+)
+def test_unchanged_data_is_not_modified(client, objective, path):
+    """Answer a revalidation with the current ETag with an empty 304."""
+    path = path.format(objective=objective)
+    etag = client.get(path).headers["ETag"]
+
+    response = client.get(path, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_write_changes_etag(client, objective):
+    """Serve the fresh data, under a new ETag, after a write to the table."""
+    etag = client.get("/objectives/").headers["ETag"]
+    client.put(f"/objectives/{objective}", json={"name": "Marathon"})
+
+    response = client.get("/objectives/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()[0]["name"] == "Marathon"
+
+
+def test_key_result_write_changes_objective_etags(client, objective):
+    """Revalidate objectives too, when a key result write changes their progress."""
+    key_result = client.get("/key_results/").json()[0]
+    etag = client.get(f"/objectives/{objective}/progress").headers["ETag"]
+    client.put(f"/key_results/{key_result['id']}", json={"progress": 90})
+
+    response = client.get(f"/objectives/{objective}/progress", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["progress"] == 60
+
+
+def test_included_key_results_count_in_etag(client, objective):
+    """Depend on key results, only when embedding them."""
+    plain = client.get("/objectives/").headers["ETag"]
+    included = client.get("/objectives/", params={"include": "key_results"}).headers["ETag"]
+    key_result = client.get("/key_results/").json()[0]
+    client.put(f"/key_results/{key_result['id']}", json={"description": "Attend all sessions"})
+
+    assert client.get("/objectives/").headers["ETag"] == plain
+    assert (
+        client.get("/objectives/", params={"include": "key_results"}).headers["ETag"]
+        != included
+    )
+
+
+def test_deleting_objective_changes_key_results_etag(client, objective):
+    """Account for the key results removed by the cascade."""
+    etag = client.get("/key_results/").headers["ETag"]
+    client.delete(f"/objectives/{objective}")
+
+    response = client.get("/key_results/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_stale_etag_gets_data(client, objective):
+    """Serve the data when none of the client's ETags is current."""
+    response = client.get("/key_results/", headers={"If-None-Match": '"key_results.0", W/"x"'})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_wildcard_does_not_hide_missing_entity(client, clean_db):
+    """Report a missing entity as Not Found, even to If-None-Match: *."""
+    response = client.get("/objectives/999", headers={"If-None-Match": "*"})
+    assert response.status_code == 404
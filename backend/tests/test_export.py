@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+
+import pytest
+
+
+def test_export_key_results_as_ndjson(client, objective):
+    """Stream one JSON object per line, in the shape of the key results responses."""
+    response = client.get("/export/key_results")
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "key_results.ndjson" in response.headers["content-disposition"]
+    lines = response.text.splitlines()
+    assert [json.loads(line) for line in lines] == client.get("/key_results/").json()
+
+
+def test_export_objectives_as_csv(client, objective):
+    """Stream a header, naming the fields, then a line per objective."""
+    response = client.get("/export/objectives", params={"format": "csv"})
+
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert rows == [
+        {
+            "id": str(objective),
+            "name": "Training",
+            "description": "Get fit in 12 weeks",
+            "progress": "40",
+        }
+    ]
+
+
+@pytest.mark.parametrize(
+    "format, expected", [("ndjson", ""), ("csv", "id,name,description,progress\r\n")]
+)
+def test_export_empty_table(client, clean_db, format, expected):
+    """Stream only the CSV header, when there is nothing to export."""
+    assert client.get("/export/objectives", params={"format": format}).text == expected
+
+
+def test_export_in_batches(client, objective, monkeypatch):
+    """Fetch and write rows a batch at a time, covering every row once."""
+    from okr_api.endpoints import export
+
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 1)
+    lines = client.get("/export/key_results").text.splitlines()
+    assert [json.loads(line)["description"] for line in lines] == ["Attend sessions", "Run 5km"]
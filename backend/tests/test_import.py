@@ -0,0 +1,105 @@
+import json
+
+
+def ndjson(*rows) -> str:
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+
+
+def test_import_objectives_with_key_results(client, clean_db):
+    """Create objectives, their embedded key results, and roll up their progress."""
+    body = ndjson(
+        {"name": "Training", "description": "Get fit", "key_results": [
+            {"description": "Attend sessions", "progress": 50},
+            {"description": "Run 5km", "progress": 30},
+        ]},
+        {"name": "Reading", "description": "Read more"},
+    )
+
+    report = client.post("/import/objectives", content=body).json()
+
+    assert report == {"imported": 2, "errors": []}
+    objectives = client.get("/objectives/", params={"include": "key_results"}).json()
+    assert [(obj["name"], obj["progress"]) for obj in objectives] == [
+        ("Training", 40), ("Reading", 0)
+    ]
+    assert [kr["description"] for kr in objectives[0]["key_results"]] == [
+        "Attend sessions", "Run 5km"
+    ]
+
+
+def test_import_reports_invalid_rows(client, clean_db):
+    """Skip, and report by row number, rows that are not valid objectives."""
+    body = ndjson({"name": "Valid", "description": "-"}, "{not json", {"name": "No description"})
+
+    report = client.post("/import/objectives", content=body).json()
+
+    assert report["imported"] == 1
+    assert report["errors"] == [
+        {"row": 2, "errors": ["Expected a JSON object"]},
+        {"row": 3, "errors": ["description: Field required"]},
+    ]
+    assert [obj["name"] for obj in client.get("/objectives/").json()] == ["Valid"]
+
+
+def test_import_key_results_from_csv(client, objective, monkeypatch):
+    """Import key results in batches, rejecting those of missing objectives."""
+    from okr_api.endpoints import imports
+
+    monkeypatch.setattr(imports, "IMPORT_BATCH_SIZE", 2)
+    body = (
+        "objective_id,description,progress,weight,short_description\n"
+        f"{objective},Swim 1km,100,2,\n"
+        f"{objective},Cycle,abc,1,\n"
+        "999,Orphan,10,1,\n"
+        f"{objective},Stretch,0,,Daily\n"
+    )
+
+    report = client.post("/import/key_results", params={"format": "csv"}, content=body).json()
+
+    assert report["imported"] == 2
+    assert [error["row"] for error in report["errors"]] == [2, 3]
+    assert report["errors"][1]["errors"] == ["objective_id: Objective 999 not found"]
+    key_results = client.get(f"/objectives/{objective}/key_results").json()
+    assert [(kr["description"], kr["weight"]) for kr in key_results[2:]] == [
+        ("Swim 1km", 2), ("Stretch", 1)
+    ]
+    # (50 + 30 + 2 * 100 + 0) / 5
+    assert client.get(f"/objectives/{objective}/progress").json()["progress"] == 56
+
+
+def test_import_reports_rows_breaking_table_constraints(client, clean_db):
+    """Report, rather than fail the import on, values the database would reject."""
+    body = ndjson(
+        {"name": "x" * 256, "description": "-"},
+        {"name": "Units", "description": "-", "key_results": [
+            {"description": "Run", "unit": 100},
+        ]},
+        {"name": "Valid", "description": "-"},
+    )
+
+    report = client.post("/import/objectives", content=body).json()
+
+    assert report["imported"] == 1
+    fields = [(error["row"], error["errors"][0].split(":")[0]) for error in report["errors"]]
+    assert fields == [(1, "name"), (2, "key_results.0.unit")]
+
+
+def test_parse_rows_across_chunks():
+    """Parse rows of an upload split at any byte, including CSV fields spanning lines."""
+    import asyncio
+
+    from okr_api.endpoints.imports import parse_rows, read_lines
+
+    body = '\ufeffobjective_id,description\n1,"Swim\n1km, ""fast"""\n2,Ré\n'.encode()
+
+    async def chunks():
+        for i in range(0, len(body), 3):
+            yield body[i:i + 3]
+
+    async def rows():
+        return [row async for row in parse_rows(read_lines(chunks()), "csv")]
+
+    assert asyncio.run(rows()) == [
+        (1, {"objective_id": "1", "description": 'Swim\n1km, "fast"'}),
+        (2, {"objective_id": "2", "description": "Ré"}),
+    ]
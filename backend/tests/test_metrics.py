@@ -0,0 +1,34 @@
+from okr_api.metrics import Histogram, metrics
+
+
+def test_histogram_cumulative_buckets():
+    """Count values in the first bucket they fit, reporting cumulative counts."""
+    histogram = Histogram([0.1, 1.0])
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative_counts() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.count == 4
+    assert histogram.sum == 3.65
+
+
+def test_metrics_per_route(client, objective):
+    """Report latency, status and database usage per route template, in Prometheus format."""
+    metrics.clear()
+    client.get(f"/objectives/{objective}")
+    client.get("/objectives/0")
+    client.get("/no/such/route")
+
+    response = client.get("/metrics")
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    route = 'method="GET",route="/objectives/{objective_id}"'
+    assert f"okr_api_request_duration_seconds_count{{{route}}} 2" in lines
+    assert f'okr_api_request_duration_seconds_bucket{{{route},le="+Inf"}} 2' in lines
+    assert f"okr_api_request_db_duration_seconds_count{{{route}}} 2" in lines
+    assert f'okr_api_requests_total{{{route},status="200"}} 1' in lines
+    assert f'okr_api_requests_total{{{route},status="404"}} 1' in lines
+    assert 'okr_api_requests_total{method="GET",route="<unmatched>",status="404"} 1' in lines
+    (queries,) = [line for line in lines if line.startswith(f"okr_api_db_queries_total{{{route}}}")]
+    assert int(queries.split()[-1]) >= 2
@@ -0,0 +1,100 @@
+import json
+import typing as t
+
+from okr_api.changes import Change
+from okr_api.notifications import (
+    MAX_PAYLOAD_BYTES, PROCESS_ID, ChangeListener, from_payload, to_payloads
+)
+
+
+PROGRESS = Change("key_results", 1, "update", ("progress",))
+
+
+def test_payloads_round_trip():
+    """Encode changes as compact JSON notification payloads, and decode them back."""
+    changes = [PROGRESS, Change("objectives", 2, "delete")]
+
+    (payload,) = to_payloads(changes, origin="worker")
+
+    assert json.loads(payload) == {
+        "origin": "worker",
+        "changes": [["key_results", 1, "update", ["progress"]], ["objectives", 2, "delete", []]],
+    }
+    assert from_payload(payload) == ("worker", changes)
+
+
+def test_payloads_split_within_size_limit():
+    """Split many changes across payloads within the NOTIFY size limit, keeping them all."""
+    changes = [Change("key_results", id, "update", ("progress",)) for id in range(1000)]
+
+    payloads = to_payloads(changes)
+
+    assert len(payloads) > 1
+    assert all(len(payload.encode()) <= MAX_PAYLOAD_BYTES for payload in payloads)
+    assert [change for payload in payloads for change in from_payload(payload)[1]] == changes
+
+
+def test_listener_skips_own_notifications():
+    """Publish the changes notified by other processes only, ignoring malformed ones."""
+    received = []
+    listener = ChangeListener(
+        "postgresql+asyncpg://postgres:password@db:5432/okr_db", on_changes=received.append
+    )
+    (own,) = to_payloads([PROGRESS])
+    (other,) = to_payloads([PROGRESS], origin="other")
+
+    for payload in (own, other, "not json"):
+        listener._on_notification(None, 0, "okr_api_changes", payload)
+
+    assert PROCESS_ID != "other"
+    assert received == [[PROGRESS]]
+    assert listener.dsn == "postgresql://postgres:password@db:5432/okr_db"
+
+
+
+def test_listener_retries_after_any_failure(monkeypatch):
+    """Keep listening after an unexpected error, rather than ending the background task."""
+    import asyncio
+
+    from okr_api import notifications
+
+    class FakeConnection:
+        def __init__(self, error: t.Optional[Exception], listening: asyncio.Event):
+            self.error = error
+            self.listening = listening
+            self.terminated = False
+
+        def add_termination_listener(self, callback):
+            pass
+
+        async def add_listener(self, channel, callback):
+            if self.error:
+                raise self.error
+            self.listening.set()
+
+        def is_closed(self):
+            return self.terminated
+
+        def terminate(self):
+            self.terminated = True
+
+    async def run() -> t.List[FakeConnection]:
+        listening = asyncio.Event()
+        connections = [FakeConnection(RuntimeError("unexpected"), listening)]
+        connections.append(FakeConnection(None, listening))
+        pending = iter(connections)
+
+        async def connect(dsn):
+            return next(pending)
+
+        monkeypatch.setattr(notifications.asyncpg, "connect", connect)
+        listener = ChangeListener("postgresql://db/okr_db", retry_seconds=0)
+        await listener.start()
+        await asyncio.wait_for(listening.wait(), timeout=1)
+        await listener.stop()
+        return connections
+
+    failed, listening = asyncio.run(run())
+
+    assert failed.terminated
+    assert listening.terminated
@@ -0,0 +1,26 @@
+def test_objectives_without_include_have_no_key_results(client, objective):
+    """Keep the plain objective representation by default."""
+    assert "key_results" not in client.get("/objectives/").json()[0]
+    assert "key_results" not in client.get(f"/objectives/{objective}").json()
+
+
+def test_objectives_include_key_results(client, objective):
+    """Embed the key results of every objective, ordered by ID."""
+    empty = client.post("/objectives", json={"name": "Empty", "description": "-"}).json()
+
+    objectives = client.get("/objectives/", params={"include": "key_results"}).json()
+
+    assert [obj["id"] for obj in objectives] == [objective, empty["id"]]
+    assert objectives[0]["key_results"] == client.get(f"/objectives/{objective}/key_results").json()
+    assert objectives[1]["key_results"] == []
+
+
+def test_objective_include_key_results(client, objective):
+    """Embed the key results of a single objective."""
+    obj = client.get(f"/objectives/{objective}", params={"include": "key_results"}).json()
+    assert [kr["description"] for kr in obj["key_results"]] == ["Attend sessions", "Run 5km"]
+
+
+def test_unknown_include(client, objective):
+    """Reject relations that cannot be included."""
+    assert client.get("/objectives/", params={"include": "owners"}).status_code == 422
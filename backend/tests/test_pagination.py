@@ -0,0 +1,77 @@
+import pytest
+
+from okr_api.pagination import NEXT_CURSOR_HEADER
+
+
+@pytest.fixture
+def key_results(client, clean_db):
+    """Create 3 Objectives, with Key Results added in interleaved order."""
+    objective_ids = [
+        client.post("/objectives", json={"name": f"O{i}", "description": "-"}).json()["id"]
+        for i in range(3)
+    ]
+    for i in range(7):
+        client.post(
+            "/key_results",
+            json={"objective_id": objective_ids[i % 3], "description": f"KR{i}"},
+        )
+    return client.get("/key_results/").json()
+
+
+def iter_pages(client, url, limit):
+    """Follow the next page cursors, until the last page."""
+    params = {"limit": limit}
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        yield response.json()
+        if NEXT_CURSOR_HEADER not in response.headers:
+            return
+        params["after"] = response.headers[NEXT_CURSOR_HEADER]
+
+
+def test_unpaginated_key_results_are_ordered_by_objective(key_results):
+    """Return all key results at once, sorted by (objective_id, id)."""
+    assert len(key_results) == 7
+    keys = [(kr["objective_id"], kr["id"]) for kr in key_results]
+    assert keys == sorted(keys)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 10])
+def test_key_result_pages_cover_all_rows_once(client, key_results, limit):
+    """Walk all pages and get the same rows as the unpaginated list."""
+    pages = list(iter_pages(client, "/key_results/", limit))
+    assert all(len(page) <= limit for page in pages)
+    assert [kr for page in pages for kr in page] == key_results
+
+
+def test_objective_pages(client, key_results):
+    """Paginate objectives by ID."""
+    pages = list(iter_pages(client, "/objectives/", 2))
+    assert [len(page) for page in pages] == [2, 1]
+    assert [obj["name"] for page in pages for obj in page] == ["O0", "O1", "O2"]
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "WzFd", "WyJhIiwxXQ"])
+def test_invalid_cursor(client, clean_db, cursor):
+    """Reject cursors not created by the server."""
+    response = client.get("/key_results/", params={"limit": 2, "after": cursor})
+    assert response.status_code == 400
+
+
+def test_filter_key_results_by_objective(client, key_results):
+    """Return only the key results of the requested objective, ordered by ID."""
+    objective_id = key_results[0]["objective_id"]
+    expected = [kr for kr in key_results if kr["objective_id"] == objective_id]
+
+    assert client.get("/key_results/", params={"objective_id": objective_id}).json() == expected
+    assert client.get(f"/objectives/{objective_id}/key_results").json() == expected
+    pages = list(iter_pages(client, f"/objectives/{objective_id}/key_results", 2))
+    assert [kr for page in pages for kr in page] == expected
+
+
+def test_key_results_of_objective_without_any(client, clean_db):
+    """Tell an objective without key results apart from a missing objective."""
+    objective_id = client.post("/objectives", json={"name": "O", "description": "-"}).json()["id"]
+    assert client.get(f"/objectives/{objective_id}/key_results").json() == []
+    assert client.get(f"/objectives/{objective_id + 1}/key_results").status_code == 404
@@ -0,0 +1,53 @@
+def progress_of(client, objective_id):
+    return client.get(f"/objectives/{objective_id}/progress").json()["progress"]
+
+
+def test_objective_progress_follows_key_results(client, objective):
+    """Roll up the average key result progress on create, update and delete."""
+    # key results at 50 and 30
+    assert progress_of(client, objective) == 40
+
+    created = client.post(
+        "/key_results", json={"objective_id": objective, "description": "Swim", "progress": 100}
+    ).json()
+    assert progress_of(client, objective) == 60
+
+    client.put(f"/key_results/{created['id']}", json={"progress": 70})
+    assert progress_of(client, objective) == 50
+
+    client.put(f"/key_results/{created['id']}", json={"description": "Swim 1km"})
+    assert progress_of(client, objective) == 50
+
+    client.delete(f"/key_results/{created['id']}")
+    assert progress_of(client, objective) == 40
+
+
+def test_weighted_objective_progress(client, objective):
+    """Weigh key results by their weight when rolling up progress."""
+    first, second = client.get(f"/objectives/{objective}/key_results").json()
+
+    client.put(f"/key_results/{first['id']}", json={"weight": 3})
+    # (3 * 50 + 30) / 4
+    assert progress_of(client, objective) == 45
+
+    client.put(f"/key_results/{second['id']}", json={"weight": 0})
+    assert progress_of(client, objective) == 50
+
+
+def test_progress_of_nested_create_and_batch_update(client, clean_db):
+    """Roll up progress of key results created with the objective, or updated in batch."""
+    objective = client.post("/objectives", json={
+        "name": "Run",
+        "description": "Run a marathon",
+        "key_results": [{"description": "10k", "progress": 25}, {"description": "20k"}],
+    }).json()
+    assert objective["progress"] == 13
+    assert progress_of(client, objective["id"]) == 13
+
+    client.patch("/key_results", json=[
+        {"id": kr["id"], "progress": 80} for kr in objective["key_results"]
+    ])
+    assert progress_of(client, objective["id"]) == 80
+    for kr in objective["key_results"]:
+        client.delete(f"/key_results/{kr['id']}")
+    assert progress_of(client, objective["id"]) == 0
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+
+@pytest.fixture
+def key_result(client, objective):
+    """ID of a key result (created with progress 50), after 2 check-ins."""
+    key_result_id = client.get(f"/objectives/{objective}/key_results").json()[0]["id"]
+    client.put(f"/key_results/{key_result_id}", json={"progress": 60})
+    client.put(f"/key_results/{key_result_id}", json={"description": "Attend all sessions"})
+    client.patch("/key_results", json=[{"id": key_result_id, "progress": 80}])
+    return key_result_id
+
+
+def test_progress_changes_are_recorded(client, key_result):
+    """Record creation and every progress change, but not changes of other fields."""
+    [bucket] = client.get(f"/key_results/{key_result}/progress_history").json()
+    assert (bucket["count"], bucket["min"], bucket["max"]) == (3, 50, 80)
+    assert bucket["avg"] == pytest.approx(63.33)
+
+
+def test_history_buckets(client, key_result):
+    """Split the range into fixed buckets, leaving out those without changes."""
+    now = datetime.now(timezone.utc)
+    # half a day off now, so that the fixture's changes sit mid-bucket, not on a boundary
+    start = now.replace(microsecond=0) - timedelta(days=10, hours=12)
+    end = start + timedelta(days=20)
+
+    history = client.get(
+        f"/key_results/{key_result}/progress_history",
+        params={"start": start.isoformat(), "end": end.isoformat(), "buckets": 20},
+    ).json()
+
+    assert len(history) == 1
+    bucket_start = datetime.fromisoformat(history[0]["start"])
+    # buckets are exactly a day wide, from start
+    assert (bucket_start - start) % timedelta(days=1) == timedelta(0)
+    assert bucket_start <= now < bucket_start + timedelta(days=1)
+
+
+def test_history_outside_range_is_empty(client, key_result):
+    """Serve no buckets for a range before any change."""
+    end = datetime.now(timezone.utc) - timedelta(days=1)
+    response = client.get(
+        f"/key_results/{key_result}/progress_history", params={"end": end.isoformat()}
+    )
+    assert response.json() == []
+
+
+def test_history_of_missing_key_result(client, clean_db):
+    """Tell a missing key result apart from one without history."""
+    assert client.get("/key_results/999/progress_history").status_code == 404
+
+
+def test_history_range_must_not_be_empty(client, key_result):
+    """Reject a range that ends before it starts."""
+    now = datetime.now(timezone.utc).isoformat()
+    response = client.get(
+        f"/key_results/{key_result}/progress_history", params={"start": now, "end": now}
+    )
+    assert response.status_code == 400
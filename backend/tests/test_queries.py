@@ -0,0 +1,68 @@
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from okr_api.queries import QueryRepeatMiddleware, assert_max_queries, capture_queries
+
+
+@pytest.fixture
+def objectives(client, clean_db):
+    """Create 3 Objectives, with 2 Key Results each."""
+    for n in range(3):
+        objective_id = client.post(
+            "/objectives", json={"name": f"Objective {n}", "description": "Described"}
+        ).json()["id"]
+        for progress in (10, 20):
+            client.post(
+                "/key_results",
+                json={"objective_id": objective_id, "description": "Do", "progress": progress},
+            )
+
+
+@pytest.mark.parametrize(
+    "url, budget",
+    [
+        # table versions (ETag) + objectives + their key results, however many objectives
+        ("/objectives/?include=key_results", 3),
+        ("/objectives/1", 2),
+        ("/key_results/?objective_id=1", 2),
+        ("/dashboard/summary", 2),
+    ],
+)
+def test_read_query_budget(client, objectives, url, budget):
+    """Read any number of entities within a fixed number of statements."""
+    with assert_max_queries(budget):
+        assert client.get(url).status_code == 200
+
+
+def test_query_budget_exceeded():
+    """Fail, listing the statements run, when over budget."""
+    with pytest.raises(AssertionError, match="2 statements run, over the budget of 1"):
+        with assert_max_queries(1) as log:
+            log.statements += ["SELECT 1", "SELECT 2"]
+
+
+def test_repeated_queries_warning(caplog):
+    """Warn of requests running the same query more than the threshold, in development."""
+    from fastapi.testclient import TestClient
+
+    async def app(scope, receive, send):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        async with engine.connect() as connection:
+            for _ in range(3):
+                await connection.execute(text("SELECT 1"))
+        await engine.dispose()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    with caplog.at_level(logging.WARNING, logger="okr_api.queries"):
+        with capture_queries() as log:
+            TestClient(QueryRepeatMiddleware(app, threshold=2)).get("/lazy")
+            TestClient(QueryRepeatMiddleware(app, threshold=3)).get("/lazy")
+
+    assert len(log) == 6
+    assert [record.getMessage() for record in caplog.records] == [
+        "GET /lazy ran the same statement 3 times (likely N+1 queries): SELECT 1"
+    ]
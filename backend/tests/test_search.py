@@ -0,0 +1,74 @@
+import pytest
+
+
+@pytest.fixture
+def catalog(client, clean_db):
+    """Objectives and key results to search, by their text."""
+    fitness = client.post("/objectives", json={
+        "name": "Improve fitness",
+        "description": "Run a marathon by autumn",
+        "key_results": [
+            {"short_description": "Weekly runs", "description": "Run 3 times every week"},
+            {"description": "Swim 1km without stopping"},
+        ],
+    }).json()
+    client.post("/objectives", json={"name": "Read more", "description": "Finish 12 books"})
+    return fitness
+
+
+def test_search_objectives_and_key_results(client, catalog):
+    """Find objectives and key results, ranking matches in titles first."""
+    hits = client.get("/search", params={"q": "run"}).json()
+
+    assert [(hit["type"], hit["title"]) for hit in hits] == [
+        ("key_result", "Weekly runs"),
+        ("objective", "Improve fitness"),
+    ]
+    assert hits[0]["objective_id"] == catalog["id"]
+    assert hits[0]["rank"] >= hits[1]["rank"]
+
+
+def test_search_requires_every_word(client, catalog):
+    """Match only rows containing all the words searched for."""
+    hits = client.get("/search", params={"q": "swim 1km"}).json()
+    assert [hit["title"] for hit in hits] == ["Swim 1km without stopping"]
+    assert client.get("/search", params={"q": "swim books"}).json() == []
+
+
+def test_search_follows_writes(client, catalog):
+    """Find rows by their current text, and no longer find deleted ones."""
+    key_result = catalog["key_results"][1]
+    client.put(f"/key_results/{key_result['id']}", json={"description": "Cycle 20km"})
+    client.delete(f"/objectives/{catalog['id']}")
+    client.post("/objectives", json={"name": "Swim more", "description": "-"})
+
+    hits = client.get("/search", params={"q": "swim"}).json()
+
+    assert [hit["title"] for hit in hits] == ["Swim more"]
+
+
+def test_search_pages(client, catalog):
+    """Serve hits a page at a time, following the next cursor."""
+    first = client.get("/search", params={"q": "run", "limit": 1})
+    second = client.get(
+        "/search", params={"q": "run", "limit": 1, "after": first.headers["X-Next-Cursor"]}
+    )
+
+    assert [hit["title"] for hit in first.json() + second.json()] == [
+        "Weekly runs", "Improve fitness"
+    ]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_search_rejects_negative_offset(client, catalog):
+    """Reject a crafted cursor carrying a negative offset, as any invalid cursor."""
+    from okr_api.pagination import encode_cursor
+
+    response = client.get("/search", params={"q": "run", "after": encode_cursor(-5)})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("q", ['"unbalanced', "AND OR NOT", "*", "run)", "   "])
+def test_search_syntax_is_not_an_error(client, catalog, q):
+    """Search for the words of any input, without failing on search syntax."""
+    assert client.get("/search", params={"q": q}).status_code == 200
@@ -0,0 +1,46 @@
+from okr_api.seed import DatasetSpec, generate, load
+
+
+SPEC = DatasetSpec(objectives=12, key_results_per_objective=3, history_depth=2, seed=7)
+
+
+def test_datasets_are_reproducible():
+    """Generate the same rows from the same seed, and others from another seed."""
+    def rows(spec):
+        return [
+            (objectives, key_results, [row["progress"] for row in history])
+            for objectives, key_results, history in generate(spec)
+        ]
+
+    assert rows(SPEC) == rows(SPEC)
+    assert rows(SPEC) != rows(DatasetSpec(**{**SPEC.__dict__, "seed": 8}))
+
+
+def test_dataset_shape():
+    """Roll up each objective's progress, and end each history at the current progress."""
+    ((objectives, key_results, history),) = generate(SPEC)
+
+    assert len(objectives) == 12
+    assert len(history) == 2 * len(key_results)
+    for objective in objectives:
+        krs = [kr for kr in key_results if kr["objective_id"] == objective["id"]]
+        assert 1 <= len(krs) <= 5
+        assert objective["weight_sum"] == sum(kr["weight"] for kr in krs)
+    for key_result, (first, last) in zip(key_results, zip(history[::2], history[1::2])):
+        assert first["progress"] <= last["progress"] == key_result["progress"]
+        assert first["recorded_at"] <= last["recorded_at"]
+
+
+def test_load_appends(client, objective):
+    """Load after the existing rows, served by the API like any other."""
+    from okr_api.db import get_async_engine
+
+    objective_ids, key_result_ids = client.portal.call(load, get_async_engine(), SPEC)
+
+    assert objective_ids == range(objective + 1, objective + 13)
+    assert len(client.get("/objectives/").json()) == 13
+    assert len(client.get("/key_results/").json()) == 2 + len(key_result_ids)
+    last = client.get(f"/key_results/{key_result_ids[-1]}/progress_history").json()
+    assert sum(bucket["count"] for bucket in last) == 2
+    created = client.post("/objectives", json={"name": "Next", "description": "After"})
+    assert created.json()["id"] == objective_ids[-1] + 1
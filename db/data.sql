@@ -14,3 +14,21 @@ INSERT INTO key_results (objective_id, description, progress, metric) VALUES
 (2, 'Reduce daily calorie intake to 1800 calories', 70, 'Calories per day'),
 (2, 'Exercise 5 times per week', 60, 'Sessions per week'),
 (2, 'Drink 2 liters of water daily', 80, 'Liters per day');
+
+-- Roll up Objectives progress from their Key Results
+UPDATE objectives SET
+    progress_sum = rollup.progress_sum,
+    weight_sum = rollup.weight_sum,
+    progress = CASE WHEN rollup.weight_sum > 0
+        THEN (2 * rollup.progress_sum + rollup.weight_sum) / (2 * rollup.weight_sum)
+        ELSE 0 END
+FROM (
+    SELECT objective_id, SUM(weight * COALESCE(progress, 0)) AS progress_sum, SUM(weight) AS weight_sum
+    FROM key_results
+    GROUP BY objective_id
+) AS rollup
+WHERE objectives.id = rollup.objective_id;
+
+-- Start the progress history of Key Results
+INSERT INTO progress_history (key_result_id, progress)
+SELECT id, COALESCE(progress, 0) FROM key_results;
@@ -2,14 +2,49 @@ CREATE TABLE IF NOT EXISTS objectives (
     id SERIAL PRIMARY KEY,
     name VARCHAR(255) NOT NULL,
     description TEXT NOT NULL,
-    progress INT DEFAULT 0
+    progress INT DEFAULT 0,
+    -- running sums over key results of (weight * progress) and weight, progress = sum / weight
+    progress_sum BIGINT NOT NULL DEFAULT 0,
+    weight_sum BIGINT NOT NULL DEFAULT 0,
+    -- full-text search, see okr_api.search
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
 );
 
 CREATE TABLE IF NOT EXISTS key_results (
     id SERIAL PRIMARY KEY,
     objective_id INT REFERENCES objectives(id) ON DELETE CASCADE,
     description TEXT NOT NULL,
+    short_description VARCHAR(255),
     progress INT DEFAULT 0,
     metric VARCHAR(255),
-    unit INT CHECK (unit >= 1 AND unit <= 99) DEFAULT 1
+    unit INT CHECK (unit >= 1 AND unit <= 99) DEFAULT 1,
+    weight INT NOT NULL DEFAULT 1 CONSTRAINT ck_key_results_weight CHECK (weight >= 0),
+    search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(short_description, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+);
+
+CREATE INDEX IF NOT EXISTS ix_key_results_objective_id ON key_results (objective_id);
+CREATE INDEX IF NOT EXISTS ix_objectives_search_vector ON objectives USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS ix_key_results_search_vector ON key_results USING GIN (search_vector);
+
+-- version counter per table, bumped by every transaction writing to it (ETags of GET responses)
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
 );
+
+-- append-only history of key results' progress, written along with every progress change
+CREATE TABLE IF NOT EXISTS progress_history (
+    id BIGSERIAL PRIMARY KEY,
+    key_result_id INT NOT NULL REFERENCES key_results(id) ON DELETE CASCADE,
+    progress INT NOT NULL,
+    recorded_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_progress_history_key_result_id_recorded_at ON progress_history (key_result_id, recorded_at);
+CREATE INDEX IF NOT EXISTS ix_progress_history_recorded_at ON progress_history USING brin (recorded_at);
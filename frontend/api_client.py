@@ -0,0 +1,139 @@
+"""HTTP client of the OKR API (backend), shared by every page and rerun of the app"""
+import os
+import typing as t
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+BASE_URL = os.environ['OKR_BACKEND_URL']
+
+DEFAULT_TIMEOUT = (3.05, 10)
+"""Seconds to wait for a connection, and then for the response to start"""
+
+
+class OkrApiClient:
+    """Client of the OKR API endpoints, on a pool of keep-alive connections.
+
+    Methods return the raw response, for callers to check its status code.
+
+    Args:
+        base_url (str): URL of the API, ie http://localhost:8000.
+        timeout (Tuple[float, float]): Connect and read timeouts, in seconds.
+        pool_size (int): Connections kept open, for concurrent requests.
+        on_write (Callable[[], None]): Called after every successful write (any method but
+            GET), ie to invalidate cached reads.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        timeout: t.Tuple[float, float] = DEFAULT_TIMEOUT,
+        pool_size: int = 10,
+        on_write: t.Callable[[], None] = lambda: None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.on_write = on_write
+        self.session = requests.Session()
+        # retry idempotent requests (not POST), ie on a keep-alive connection the server closed
+        retries = Retry(total=2, backoff_factor=0.1, status_forcelist=())
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, path: str, **kwargs: t.Any) -> requests.Response:
+        """Send a request to an API path, ie /objectives/, with the client's timeout."""
+        response = self.session.request(
+            method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs
+        )
+        if method != "GET" and response.ok:
+            self.on_write()
+        return response
+
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+
+    # Dashboard
+
+    def get_dashboard_summary(self, limit: t.Optional[int] = None) -> requests.Response:
+        """Aggregates of the key results of the (first limit) objectives."""
+        return self.request("GET", "/dashboard/summary", params={"limit": limit})
+
+    # Objectives
+
+    def list_objectives(self, include: t.Optional[str] = None) -> requests.Response:
+        """All objectives; with include='key_results', with their key results embedded."""
+        return self.request("GET", "/objectives/", params={"include": include})
+
+    def get_objective(self, objective_id: int) -> requests.Response:
+        return self.request("GET", f"/objectives/{objective_id}")
+
+    def create_objective(
+        self,
+        name: str,
+        description: str,
+        key_results: t.Sequence[t.Dict[str, t.Any]] = (),
+    ) -> requests.Response:
+        """Create an objective, along with its key results (all of them, or none)."""
+        return self.request(
+            "POST",
+            "/objectives",
+            json={"name": name, "description": description, "key_results": list(key_results)},
+        )
+
+    def update_objective(self, objective_id: int, **fields: t.Any) -> requests.Response:
+        """Update fields of an objective, ie name or description."""
+        return self.request("PUT", f"/objectives/{objective_id}", json=fields)
+
+    def delete_objective(self, objective_id: int) -> requests.Response:
+        return self.request("DELETE", f"/objectives/{objective_id}")
+
+    # Key Results
+
+    def list_key_results(self, objective_id: t.Optional[int] = None) -> requests.Response:
+        """All key results, or those of an objective."""
+        return self.request("GET", "/key_results/", params={"objective_id": objective_id})
+
+    def create_key_result(self, objective_id: int, **fields: t.Any) -> requests.Response:
+        """Create a key result of an objective, ie with description and progress."""
+        return self.request(
+            "POST", "/key_results", json={"objective_id": objective_id, **fields}
+        )
+
+    def update_key_result(self, key_result_id: int, **fields: t.Any) -> requests.Response:
+        """Update fields of a key result, ie progress."""
+        return self.request("PUT", f"/key_results/{key_result_id}", json=fields)
+
+    def delete_key_result(self, key_result_id: int) -> requests.Response:
+        return self.request("DELETE", f"/key_results/{key_result_id}")
+
+
+@st.cache_resource
+def get_api_client() -> OkrApiClient:
+    """The client of the API, created once and shared by every session and rerun.
+
+    Its writes drop the cached reads of data_layer, so the next rerun shows them.
+    """
+
+    def invalidate_cached_reads():
+        from data_layer import invalidate
+        invalidate()
+    return OkrApiClient(on_write=invalidate_cached_reads)
+
+
+class KRUpdateData(t.TypedDict):
+    progress: float
+    unit: int
+    kr_id: int
+
+
+def create_put_key_results_callback(data: KRUpdateData) -> t.Callable[[], requests.Response]:
+    """Create a callback, that saves the progress of a key result."""
+
+    def put_key_results():
+        return get_api_client().update_key_result(data['kr_id'], progress=data['progress'])
+    return put_key_results
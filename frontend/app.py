@@ -1,13 +1,10 @@
 import typing as t
 import streamlit as st
-import requests
-import json
-import os
-
-
-BASE_URL = os.environ['OKR_BACKEND_URL']
 
 
+from api_client import get_api_client
+from data_layer import ApiError, load_dashboard_summary, load_key_results, load_objective, load_objectives
+from key_results_card import KeyResultsCard
 from knowledge_base import knowledge_base_ui
 
 
@@ -28,27 +25,18 @@ def main():
         knowledge_base_ui()
 
 
-from key_results_card import KeyResultsCard
-
-response = None
-
-def start_up_query():
-    """Initial query to fetch objectives."""
-    # Fetch the first 4 objectives to display in the dashboard
-    global response
-    if not response:
-        # Make a GET request to fetch objectives
-        response = requests.get(f"{BASE_URL}/objectives/")
-    return response
-
 # OKR Dashboard
 def dashboard_ui():
     """Render the Dashboard UI."""
     # RENDER
     st.header("Dashboard: Recent Objectives")
-    response = start_up_query()
-    if response.status_code == 200:
-        objectives = response.json()
+    # a single request, for the aggregates of the 4 objectives shown, computed by the server
+    # (cached, as every read of data_layer, until a write or its TTL)
+    try:
+        objectives = load_dashboard_summary(limit=4)
+    except ApiError as error:
+        st.error(f"Failed to fetch dashboard summary: {error}")
+    else:
         # Display top 4 objectives in a grid layout
         first_slice = (0, 2)
         second_slice = (2, 4)
@@ -62,25 +50,27 @@ def dashboard_ui():
                     # RENDER Objective Description as expander
                     with st.expander("Description"):
                         st.write(obj["description"])
+                    # RENDER Objective progress, rolled up from its Key Results
+                    st.progress((obj["progress"] or 0) / 100, text=f"Progress: {obj['progress'] or 0}%")
+                    # RENDER Key Results aggregates
+                    st.write(f"Key Results: {obj['completed_key_results']} of {obj['key_results']} completed")
+                    if obj["key_results"]:
+                        st.caption(
+                            f"Progress min {obj['min_progress']}% / "
+                            f"avg {obj['avg_progress']:.0f}% / max {obj['max_progress']}%"
+                        )
                     # RENDER expander, which pushes elemnt below in grid when opened !
                     with st.expander("Key Results"):
-
-                        key_results_response = requests.get(f"{BASE_URL}/key_results/")
-
-                        if key_results_response.status_code == 200:
-
-                            all_key_results_in_db = key_results_response.json()
-                            key_results_of_current_objective = sorted([kr for kr in all_key_results_in_db if kr["objective_id"] == obj["id"]], 
-                                                                      key=lambda x: x["id"], reverse=False)
-
+                        # only this Objective's Key Results, ordered by id (a cached read)
+                        try:
+                            key_results_of_current_objective = load_key_results(objective_id=obj["id"])
+                        except ApiError as error:
+                            st.error(f"Failed to fetch key results: {error}")
+                        else:
                             # Key Results Card Component
-                            # Render Key Results Card for Objective
+                            # Render Key Results Card for Objective, to check-in progress
                             key_results_card = KeyResultsCard(st, key_results_of_current_objective)
                             key_results_card.render()
-                        else:
-                            st.error(f"Failed to fetch key results: {key_results_response.status_code} - {key_results_response.text}")
-    else:
-        st.error(f"Failed to fetch objectives: {response.status_code} - {response.text}")
 
 
 # Objectives CRUD UI
@@ -98,10 +88,12 @@ def objectives_ui():
     # Nested Key Result Creation/Attachment
     st.markdown("##### Key Results")
 
-    # Server Data Fetching
-    response = start_up_query()
-    if response.status_code == 200:
-        objectives = response.json()
+    # Server Data Fetching: Objectives with their Key Results embedded, in one request
+    try:
+        objectives = load_objectives(include="key_results")
+    except ApiError as error:
+        st.error(f"Failed to fetch objectives: {error}")
+        objectives = []
 
     ### STATE management ###
     # the list of KRs is always empty at first, in the Create New Objective flow 
@@ -179,30 +171,24 @@ def objectives_ui():
 
     # RENDER CREATE OBJECTIVE BUTTON: Create Objective and Nested Key Results
     if st.button("Create Objective"):
-        payload = {"name": title, "description": description}
-        response = requests.post(f"{BASE_URL}/objectives", 
-                                 headers={"Content-Type": "application/json"},
-                                 data=json.dumps(payload))
-        if response.status_code == 200:
-            new_objective = response.json()
-            st.success("Objective created successfully!")
-
-            for kr in st.session_state["key_results_for_objective"]:
-                kr_payload = {
-                    "objective_id": new_objective["id"],
+        # Objective and its Key Results are created all together, or not at all
+        response = get_api_client().create_objective(
+            title,
+            description,
+            key_results=[
+                {
                     "short_description": kr["short_description"],
                     "description": kr["description"],
                     "progress": kr["progress"],
                     "metric": kr["metric"],
                     "unit": kr["unit"],  # Persist unit value
                 }
-                kr_response = requests.post(f"{BASE_URL}/key_results",
-                                            headers={"Content-Type": "application/json"},
-                                            data=json.dumps(kr_payload))
-                if kr_response.status_code == 200:
-                    st.success(f"Key Result '{kr['short_description']}' added successfully!")
-                else:
-                    st.error(f"Failed to add Key Result '{kr['short_description']}': {kr_response.status_code} - {kr_response.text}")
+                for kr in st.session_state["key_results_for_objective"]
+            ],
+        )
+        if response.status_code == 200:
+            new_objective = response.json()
+            st.success(f"Objective created successfully, with {len(new_objective['key_results'])} Key Results!")
 
             st.session_state["key_results_for_objective"] = []
             st.rerun()
@@ -213,25 +199,15 @@ def objectives_ui():
     st.subheader("Catalog of Objectives")
 
     # # Fetch objectives
-    # objectives_response = requests.get(f"{BASE_URL}/objectives/")
+    # objectives_response = get_api_client().list_objectives()
     # if objectives_response.status_code == 200:
     #     objectives = objectives_response.json()
     # else:
     #     st.error(f"Failed to fetch objectives: {objectives_response.status_code} - {objectives_response.text}")
     #     return
 
-    # Fetch key results for mapping
-    key_results_response = requests.get(f"{BASE_URL}/key_results/")
-    key_results_map = {}
-    if key_results_response.status_code == 200:
-        key_results = key_results_response.json()
-        for kr in key_results:
-            if kr["objective_id"] not in key_results_map:
-                key_results_map[kr["objective_id"]] = []
-            key_results_map[kr["objective_id"]].append(kr)
-    else:
-        st.error(f"Failed to fetch key results: {key_results_response.status_code} - {key_results_response.text}")
-        return
+    # Map Objectives to their Key Results, already embedded in the fetched Objectives
+    key_results_map = {obj["id"]: obj["key_results"] for obj in objectives if obj["key_results"]}
 
     # CSS for hover effect and styling
     st.markdown("""
@@ -284,10 +260,9 @@ def objectives_ui():
 
         # Render Save Button for changes to Objective
         if st.button(f"Save Objective Changes (ID: {objective_id})", key=f"save_obj_changes_{objective_id}"):
-            payload = {"name": obj_name, "description": obj_description}
-            response = requests.put(f"{BASE_URL}/objectives/{objective_id}", 
-                                    headers={"Content-Type": "application/json"},
-                                    data=json.dumps(payload))
+            response = get_api_client().update_objective(
+                objective_id, name=obj_name, description=obj_description
+            )
             if response.status_code == 200:
                 st.success(f"Objective '{obj_name}' updated successfully!")
                 # st.rerun()
@@ -295,7 +270,7 @@ def objectives_ui():
                 st.error(f"Failed to update objective: {response.status_code} - {response.text}")
 
         # Iteratively Render Key Results for the Objective
-        if objective_id in key_results_map:  # uses a new server data request (can be avoided if all app uses the same state keys for nesting obj and krs)
+        if objective_id in key_results_map:
             for kr in key_results_map[objective_id]:
                 # Editable fields for Key Result
                 kr_short_description = st.text_input(f"Key Result Title (ID: {kr['id']})", value=kr.get('short_description', ''), key=f"edit_kr_title_{kr['id']}")
@@ -303,13 +278,11 @@ def objectives_ui():
 
                 # Save changes to Key Result
                 if st.button(f"Save Key Result Changes (ID: {kr['id']})", key=f"save_kr_changes_{kr['id']}"):
-                    kr_payload = {
-                        "short_description": kr_short_description,
-                        "description": kr_description,
-                    }
-                    kr_response = requests.put(f"{BASE_URL}/key_results/{kr['id']}",
-                                               headers={"Content-Type": "application/json"},
-                                               data=json.dumps(kr_payload))
+                    kr_response = get_api_client().update_key_result(
+                        kr['id'],
+                        short_description=kr_short_description,
+                        description=kr_description,
+                    )
                     if kr_response.status_code == 200:
                         st.success(f"Key Result '{kr_short_description}' updated successfully!")
                         st.rerun()
@@ -326,15 +299,14 @@ def objectives_ui():
     objective_id = st.number_input("Objective ID", min_value=1, step=1, value=None)
     # Show Objective to be deleted, given ID (state)
     if objective_id:
-        response = requests.get(f"{BASE_URL}/objectives/{objective_id}")
-        if response.status_code == 200:
-            objective = response.json()
+        try:
+            objective = load_objective(objective_id)
             st.write(f"Objective to be deleted: {objective['name']} - {objective['description']}")
-        else:
-            st.error(f"Failed to fetch objective: {response.status_code} - {response.text}")
+        except ApiError as error:
+            st.error(f"Failed to fetch objective: {error}")
     # Delete button
     if st.button("Delete Objective"):
-        response = requests.delete(f"{BASE_URL}/objectives/{objective_id}")
+        response = get_api_client().delete_objective(objective_id)
         if response.status_code == 200:
             st.success("Objective deleted successfully!")
         else:
@@ -355,18 +327,13 @@ def key_results_ui():
     metric = st.text_input("Metric (Optional)")
     unit = st.number_input("Unit (Optional)", min_value=1, max_value=99, step=1, value=1)  # Add unit input
     if st.button("Create Key Result"):
-        payload = {
-            "objective_id": objective_id,
-            "description": description,
-            "short_description": short_description,
-            "progress": progress,
-            "metric": metric,
-            "unit": unit,  # Persist unit value
-        }
-        response = requests.post(
-            f"{BASE_URL}/key_results",
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload),
+        response = get_api_client().create_key_result(
+            objective_id,
+            description=description,
+            short_description=short_description,
+            progress=progress,
+            metric=metric,
+            unit=unit,  # Persist unit value
         )
         if response.status_code == 200:
             st.success("Key Result created successfully!")
@@ -377,19 +344,19 @@ def key_results_ui():
     # READ Key Results
     st.subheader("Catalog of Key Results")
     
-    # Fetch objectives for mapping
-    objectives_response = requests.get(f"{BASE_URL}/objectives/")
+    # Fetch objectives for mapping (the same cached read as the Objectives page)
     objectives_map = {}
-    if objectives_response.status_code == 200:
-        objectives = objectives_response.json()
-        objectives_map = {obj["id"]: obj["name"] for obj in objectives}
-    else:
-        st.error(f"Failed to fetch objectives: {objectives_response.status_code} - {objectives_response.text}")
+    try:
+        objectives_map = {obj["id"]: obj["name"] for obj in load_objectives(include="key_results")}
+    except ApiError as error:
+        st.error(f"Failed to fetch objectives: {error}")
 
     # Fetch key results
-    response = requests.get(f"{BASE_URL}/key_results/")
-    if response.status_code == 200:
-        key_results = response.json()
+    try:
+        key_results = load_key_results()
+    except ApiError as error:
+        st.error(f"Failed to fetch key results: {error}")
+    else:
 
         # CSS for hover effect and styling
         st.markdown("""
@@ -423,14 +390,12 @@ def key_results_ui():
                 <p><strong>Objective:</strong> {objective_name}</p>
             </div>
             """, unsafe_allow_html=True)
-    else:
-        st.error(f"Failed to fetch key results: {response.status_code} - {response.text}")
 
     # Delete Key Result
     st.subheader("Delete Key Result")
     key_result_id = st.number_input("Key Result ID", min_value=1, step=1)
     if st.button("Delete Key Result"):
-        response = requests.delete(f"{BASE_URL}/key_results/{key_result_id}")
+        response = get_api_client().delete_key_result(key_result_id)
         if response.status_code == 200:
             st.success("Key Result deleted successfully!")
         else:
@@ -0,0 +1,68 @@
+"""Cached reads of the OKR API, shared by every page, session and rerun of the app
+
+Each read is fetched once, then served from st.cache_data until its TTL
+expires, or until the app writes through the API client, which clears them
+all (see api_client.get_api_client). Writes made elsewhere (ie by other
+clients of the API) show once the TTL has expired.
+"""
+import os
+import typing as t
+
+import requests
+import streamlit as st
+
+from api_client import get_api_client
+
+
+CACHE_TTL = int(os.environ.get('OKR_FRONTEND_CACHE_TTL', 30))
+"""Seconds a read is served from the cache"""
+
+
+class ApiError(Exception):
+    """A read from the API failed; not cached, so the next rerun retries it.
+
+    Args:
+        response (requests.Response): The failed response.
+    """
+
+    def __init__(self, response: requests.Response):
+        super().__init__(f"{response.status_code} - {response.text}")
+        self.status_code = response.status_code
+
+
+def _json(response: requests.Response) -> t.Any:
+    if response.status_code != 200:
+        raise ApiError(response)
+    return response.json()
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_dashboard_summary(limit: t.Optional[int] = None) -> t.List[t.Dict[str, t.Any]]:
+    """Aggregates of the key results of the (first limit) objectives."""
+    return _json(get_api_client().get_dashboard_summary(limit=limit))
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_objectives(include: t.Optional[str] = None) -> t.List[t.Dict[str, t.Any]]:
+    """All objectives; with include='key_results', with their key results embedded."""
+    return _json(get_api_client().list_objectives(include=include))
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_objective(objective_id: int) -> t.Dict[str, t.Any]:
+    return _json(get_api_client().get_objective(objective_id))
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_key_results(objective_id: t.Optional[int] = None) -> t.List[t.Dict[str, t.Any]]:
+    """All key results, or those of an objective."""
+    return _json(get_api_client().list_key_results(objective_id=objective_id))
+
+
+CACHED_READS = (load_dashboard_summary, load_objectives, load_objective, load_key_results)
+
+
+def invalidate():
+    """Drop every cached read, ie after a write changed the data they hold."""
+    for read in CACHED_READS:
+        read.clear()
@@ -1,9 +1,8 @@
 """Key Result Item"""
 from attr import define, field, Factory
 import typing as t
-import requests
-import json
-import os
+
+from api_client import create_put_key_results_callback
 
 # Designed to render data
 # from key_result_item_view import KeyResultItemView
@@ -14,27 +13,6 @@ from key_result_item_edit import KeyResultItemEdit
 
 ## Helpers
 
-BASE_URL = os.environ['OKR_BACKEND_URL']
-
-
-class KRUpdateDate(t.TypedDict):
-    progress: float
-    unit: int
-    kr_id: int
-
-
-def create_put_key_results_callback(data: KRUpdateDate):
-
-    def put_key_results():
-        payload = {"progress": data['progress']}
-        update_response = requests.put(
-            f"{BASE_URL}/key_results/{data['kr_id']}",
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload),
-        )
-        return update_response
-    return put_key_results
-
 def get_progress_bar_value(st: t.Any, kr_id: int) -> float:
     """Get the progress bar value from session state."""
     return st.session_state.get(f'progress_slider_{kr_id}', 0.0)
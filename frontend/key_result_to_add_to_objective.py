@@ -2,33 +2,6 @@
 
 from attr import define, field, Factory
 import typing as t
-import requests
-import json
-import os
-
-
-## Helpers
-
-BASE_URL = os.environ['OKR_BACKEND_URL']
-
-
-class KRUpdateDate(t.TypedDict):
-    progress: float
-    kr_id: int
-
-
-def create_put_key_results_callback(data: KRUpdateDate):
-
-    def put_key_results():
-        payload = {"progress": data['progress']}
-        update_response = requests.put(
-            f"{BASE_URL}/key_results/{data['kr_id']}",
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload),
-        )
-        return update_response
-    return put_key_results
-
 
 
 ## Main